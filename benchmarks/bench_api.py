@@ -0,0 +1,80 @@
+"""Latency of every ``/analysis`` endpoint.
+
+Requests go to the app in-process through httpx's ASGI transport, or to a
+running server with ``--url``. Endpoints are discovered from the app's
+routes, with an ``exact=true`` variant for those that take it. Cached runs
+measure the response cache; ``--no-cache`` adds a unique query parameter to
+every request so each one computes its response.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import statistics
+import time
+import httpx
+from src.api.main import app
+
+PREFIX = '/analysis'
+
+# httpx logs every request at INFO, which would dominate the timings
+logging.getLogger('httpx').setLevel(logging.WARNING)
+
+
+def analysis_requests():
+    """Request paths covering every ``/analysis`` route."""
+    requests = []
+    for route in app.routes:
+        if not getattr(route, 'path', '').startswith(PREFIX):
+            continue
+        requests.append(route.path)
+        if any(param.name == 'exact' for param in route.dependant.query_params):
+            requests.append(f"{route.path}?exact=true")
+    return requests
+
+
+def summarize(latencies):
+    ordered = sorted(latencies)
+    return {
+        'p50_ms': statistics.median(ordered) * 1000,
+        'p99_ms': ordered[min(len(ordered) - 1, round(len(ordered) * 0.99))] * 1000,
+        'mean_ms': statistics.fmean(ordered) * 1000,
+    }
+
+
+async def _bench(client, path, iterations, cache):
+    separator = '&' if '?' in path else '?'
+    latencies = []
+    for iteration in range(-1, iterations):
+        url = path if cache else f"{path}{separator}_bench={time.monotonic_ns()}"
+        started = time.perf_counter()
+        response = await client.get(url)
+        elapsed = time.perf_counter() - started
+        response.raise_for_status()
+        # The first request warms the cache and connection pool
+        if iteration >= 0:
+            latencies.append(elapsed)
+    return summarize(latencies)
+
+
+async def _run(base_url, iterations, cache):
+    if base_url:
+        client = httpx.AsyncClient(base_url=base_url, timeout=60)
+    else:
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url='http://bench', timeout=60)
+    async with client:
+        return {path: await _bench(client, path, iterations, cache) for path in analysis_requests()}
+
+
+def run(iterations=100, cache=True, base_url=None):
+    """``{path: {'p50_ms', 'p99_ms', 'mean_ms'}}`` over ``iterations`` sequential requests per endpoint."""
+    return asyncio.run(_run(base_url, iterations, cache))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark p50/p99 latency of the /analysis endpoints")
+    parser.add_argument('--iterations', type=int, default=100, help="Requests per endpoint")
+    parser.add_argument('--url', help="Base URL of a running API (default: in-process)")
+    parser.add_argument('--no-cache', action='store_true', help="Defeat the response cache")
+    args = parser.parse_args()
+    print(json.dumps(run(args.iterations, not args.no_cache, args.url), indent=2))
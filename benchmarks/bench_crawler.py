@@ -0,0 +1,85 @@
+"""Crawler throughput against the local fixture site.
+
+Listing pages go through ``BayutListingClient`` as in ``--listing-mode http``;
+detail pages are fetched over HTTP and run through the same lxml extraction
+as ``src.crawler.replay``, so neither needs a browser.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import time
+import httpx
+from benchmarks.fixture_site import FixtureSite
+from src.crawler.bayut import HTTP_HEADERS, BayutListingClient
+from src.crawler.extraction import AMENITY_DIALOG_SPEC, DETAIL_SPEC, apply_detail_result, extract_from_html
+
+# httpx logs every request at INFO, which would dominate the timings
+logging.getLogger('httpx').setLevel(logging.WARNING)
+
+
+def bench_listing_pages(site, pages, concurrency=8):
+    client = BayutListingClient(site.listing_url, concurrency=concurrency)
+    crawled = cards = 0
+    started = time.perf_counter()
+    for _, listings in client.iter_listing_pages(max_pages=pages):
+        crawled += 1
+        cards += len(listings)
+    elapsed = time.perf_counter() - started
+    return {
+        'listing_pages': crawled,
+        'listing_cards': cards,
+        'listing_pages_per_sec': crawled / elapsed,
+        'listing_cards_per_sec': cards / elapsed,
+    }
+
+
+def _extract_detail(html, url):
+    result = extract_from_html(html, DETAIL_SPEC, url)
+    dialog = extract_from_html(html, AMENITY_DIALOG_SPEC, url)
+    if dialog['groups'].get('amenity_groups'):
+        result['groups']['amenity_groups'] = dialog['groups']['amenity_groups']
+    return apply_detail_result(result, {})
+
+
+async def _fetch_details(urls, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+    async with httpx.AsyncClient(headers=HTTP_HEADERS, timeout=30) as client:
+        async def fetch(url):
+            async with semaphore:
+                response = await client.get(url)
+                response.raise_for_status()
+                return url, response.text
+        return await asyncio.gather(*(fetch(url) for url in urls))
+
+
+def bench_detail_pages(site, count, concurrency=8):
+    urls = [site.detail_url(index) for index in range(count)]
+    started = time.perf_counter()
+    pages = asyncio.run(_fetch_details(urls, concurrency))
+    fetched = time.perf_counter()
+    extracted = [_extract_detail(html, url) for url, html in pages]
+    finished = time.perf_counter()
+    return {
+        'detail_pages': len(extracted),
+        'detail_pages_per_sec': len(extracted) / (finished - started),
+        'detail_extract_per_sec': len(extracted) / (finished - fetched),
+    }
+
+
+def run(pages=50, details=500, concurrency=8, delay=0.0):
+    """Crawl ``pages`` listing pages and ``details`` detail pages from a fresh fixture site."""
+    with FixtureSite(pages=max(pages, details // 24 + 1), delay=delay) as site:
+        results = bench_listing_pages(site, pages, concurrency)
+        results.update(bench_detail_pages(site, details, concurrency))
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark crawler pages/sec against the fixture site")
+    parser.add_argument('--pages', type=int, default=50, help="Listing pages to crawl")
+    parser.add_argument('--details', type=int, default=500, help="Detail pages to fetch and extract")
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--delay-ms', type=float, default=0, help="Added fixture latency per response")
+    args = parser.parse_args()
+    print(json.dumps(run(args.pages, args.details, args.concurrency, args.delay_ms / 1000), indent=2))
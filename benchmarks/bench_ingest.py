@@ -0,0 +1,120 @@
+"""Ingest throughput through the Celery tasks, run eagerly in this process.
+
+Uses listings far above the ``generate_data`` range and deletes them again
+afterwards (rebuilding the rollups), so it can run against a loaded
+database. Point ``DATABASE_URL`` at a scratch database all the same.
+"""
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import json
+import logging
+import multiprocessing
+import time
+from sqlalchemy import and_, delete, func
+from benchmarks.synthetic import synthetic_listing
+from src.models.history import PriceHistory
+from src.models.property import Property
+from src.processor.celery_tasks import celery_app, get_engine, process_property_batch, process_property_details
+from src.processor.price_history import rebuild_trend_buckets
+from src.processor.region_stats import reconcile_region_stats
+from src.processor.sketches import rebuild_price_sketches
+
+# Synthetic listing index of the first benchmark listing (property ID 100000000)
+FIRST_INDEX = 90_000_000
+
+
+def _listings(first, count, price_factor=1.0):
+    listings = []
+    for index in range(first, first + count):
+        listing = synthetic_listing(index)
+        if price_factor != 1.0:
+            price = int(listing['price'].replace(',', '')) * price_factor
+            listing['price'] = f"{int(price):,}"
+        listings.append(listing)
+    return listings
+
+
+def _batch_rate(listings, batch_size):
+    started = time.perf_counter()
+    for offset in range(0, len(listings), batch_size):
+        process_property_batch.delay(listings[offset:offset + batch_size])
+    return len(listings) / (time.perf_counter() - started)
+
+
+def _eager_mode():
+    celery_app.conf.update(task_always_eager=True, task_eager_propagates=True)
+    # The tasks log every listing at INFO
+    logging.getLogger('src.processor.celery_tasks').setLevel(logging.WARNING)
+    logging.getLogger('celery.app.trace').setLevel(logging.WARNING)
+
+
+def _start_worker(_):
+    get_engine()
+    # Held briefly, so every worker process is started before the clock runs
+    time.sleep(0.5)
+
+
+def _concurrent_batch_rate(listings, batch_size, workers):
+    # Separate processes, like prefork workers, so the GIL does not cap the rate;
+    # batches still share the region_stats, price_sketches and data_versions rows
+    batches = [listings[offset:offset + batch_size] for offset in range(0, len(listings), batch_size)]
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(workers, mp_context=context, initializer=_eager_mode) as executor:
+        list(executor.map(_start_worker, range(workers)))
+        started = time.perf_counter()
+        list(executor.map(process_property_batch.delay, batches))
+        return len(listings) / (time.perf_counter() - started)
+
+
+def _detail_rate(listings):
+    started = time.perf_counter()
+    for listing in listings:
+        process_property_details.delay(listing)
+    return len(listings) / (time.perf_counter() - started)
+
+
+def _id_range(column, first_id, last_id):
+    # Among IDs of the same length string order is numeric order
+    return and_(func.length(column) == len(first_id), column.between(first_id, last_id))
+
+
+def cleanup(first, count):
+    """Delete the benchmark listings and their history, then rebuild the rollups they touched."""
+    first_id, last_id = synthetic_listing(first)['property_id'], synthetic_listing(first + count - 1)['property_id']
+    with get_engine().begin() as connection:
+        connection.execute(delete(PriceHistory).where(_id_range(PriceHistory.property_id, first_id, last_id)))
+        connection.execute(delete(Property).where(_id_range(Property.property_id, first_id, last_id)))
+        reconcile_region_stats(connection)
+        rebuild_price_sketches(connection)
+        rebuild_trend_buckets(connection)
+
+
+def run(rows=5000, batch_size=500, details=500, workers=4):
+    """Rows/sec for new, unchanged and re-priced batches, for new batches sent
+    from ``workers`` processes at once, and for single-listing tasks."""
+    _eager_mode()
+    get_engine()
+    results = {}
+    try:
+        results['batch_insert_rows_per_sec'] = _batch_rate(_listings(FIRST_INDEX, rows), batch_size)
+        results['batch_unchanged_rows_per_sec'] = _batch_rate(_listings(FIRST_INDEX, rows), batch_size)
+        results['batch_repriced_rows_per_sec'] = _batch_rate(_listings(FIRST_INDEX, rows, 1.05), batch_size)
+        results['detail_insert_rows_per_sec'] = _detail_rate(_listings(FIRST_INDEX + rows, details))
+        results['detail_unchanged_rows_per_sec'] = _detail_rate(_listings(FIRST_INDEX + rows, details))
+        if workers > 1:
+            results['concurrent_batch_insert_rows_per_sec'] = _concurrent_batch_rate(
+                _listings(FIRST_INDEX + rows + details, rows), batch_size, workers
+            )
+    finally:
+        cleanup(FIRST_INDEX, 2 * rows + details)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark ingest rows/sec through the Celery tasks in eager mode")
+    parser.add_argument('--rows', type=int, default=5000, help="Listings sent through process_property_batch")
+    parser.add_argument('--batch-size', type=int, default=500)
+    parser.add_argument('--details', type=int, default=500, help="Listings sent through process_property_details")
+    parser.add_argument('--workers', type=int, default=4, help="Processes sending batches at once (1 to skip)")
+    args = parser.parse_args()
+    print(json.dumps(run(args.rows, args.batch_size, args.details, args.workers), indent=2))
@@ -0,0 +1,186 @@
+"""Local stand-in for bayut.com serving synthetic listing and detail pages.
+
+Listing pages carry JSON-LD cards and ``/page-N/`` pagination like the real
+site; detail pages carry the aria-labelled fields in ``DETAIL_SPEC``. Pages
+are generated on request from ``benchmarks.synthetic``, so any page count
+costs no memory.
+"""
+from html import escape
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+import argparse
+import json
+import re
+import threading
+import time
+from benchmarks.synthetic import synthetic_listing
+
+LISTING_PATH = '/for-sale/property/dubai/'
+CARDS_PER_PAGE = 24
+FIRST_PROPERTY_ID = 10_000_000
+
+_PAGE_PATH = re.compile(r'^/for-sale/property/dubai/(?:page-(\d+)/)?$')
+_DETAIL_PATH = re.compile(r'^/property/details-(\d+)\.html$')
+
+
+def _json_ld(listing, base_url):
+    return {
+        '@type': listing['property_type'],
+        'url': f"{base_url}/property/details-{listing['property_id']}.html",
+        'name': listing['title'],
+        'image': listing['image_url'],
+        'geo': {'latitude': listing['latitude'], 'longitude': listing['longitude']},
+        'floorSize': {'value': listing['area'].replace(' sqft', '')},
+        'numberOfRooms': {'value': listing['beds']},
+        'numberOfBathroomsTotal': int(listing['baths']),
+        'address': {
+            'addressCountry': listing['country'],
+            'addressLocality': listing['location'],
+            'addressRegion': listing['region'],
+        },
+    }
+
+
+def render_listing_page(page, pages, base_url, seed=0):
+    total = pages * CARDS_PER_PAGE
+    cards = []
+    for index in range((page - 1) * CARDS_PER_PAGE, page * CARDS_PER_PAGE):
+        listing = synthetic_listing(index, seed)
+        cards.append(
+            '<li><article>'
+            f'<a href="/property/details-{listing["property_id"]}.html">{escape(listing["title"])}</a>'
+            f'<span aria-label="Price">{listing["price"]}</span>'
+            f'<script type="application/ld+json">{json.dumps(_json_ld(listing, base_url))}</script>'
+            '</article></li>'
+        )
+    pagination = ''.join(
+        f'<a href="{LISTING_PATH}page-{number}/">{number}</a>'
+        for number in range(max(2, page - 2), min(pages, page + 3))
+    )
+    if page < pages:
+        pagination += f'<a title="Next" href="{LISTING_PATH}page-{page + 1}/?sort=date_desc">Next</a>'
+    first = (page - 1) * CARDS_PER_PAGE + 1
+    return (
+        '<html><head><title>Properties for sale in Dubai</title></head><body>'
+        '<h1>Properties for sale in Dubai</h1>'
+        f'<span>{first} - {first + CARDS_PER_PAGE - 1} of {total:,} Properties</span>'
+        f'<ul>{"".join(cards)}</ul><div role="navigation">{pagination}</div>'
+        '</body></html>'
+    )
+
+
+def render_detail_page(index, seed=0):
+    listing = synthetic_listing(index, seed)
+    details = {
+        'Type': listing['property_type'],
+        'Purpose': listing['purpose'],
+        'Reference': listing['reference'],
+        'Furnishing': listing['furnishing'],
+        'Completion status': listing['completion_status'],
+    }
+    if listing['trucheck_date']:
+        details['Trucheck date'] = listing['trucheck_date']
+    amenities = ''.join(f'<span class="_7181e5ac">{escape(item)}</span>' for item in listing['features']['General'])
+    return (
+        '<html><body>'
+        f'<h1 class="fcca24e0">{escape(listing["title"])}</h1>'
+        f'<span aria-label="Price">{listing["price"]}</span>'
+        f'<span aria-label="Beds">{listing["beds"]}</span><span aria-label="Baths">{listing["baths"]}</span>'
+        f'<span aria-label="Area">{listing["area"]}</span>'
+        '<div aria-label="Property description"><span class="_3547dac9">'
+        f'{escape(listing["description"])}</span></div>'
+        '<div aria-label="Property details">'
+        + ''.join(f'<span aria-label="{label}">{escape(value)}</span>' for label, value in details.items())
+        + '</div>'
+        f'<div class="_34032b68">{amenities}</div>'
+        '<div aria-label="Agency info">'
+        f'<h2>{escape(listing["agent_name"])}</h2><h3 aria-label="Agency name">{escape(listing["agency_name"])}</h3>'
+        '<a aria-label="View all properties" href="/companies/agency/">View all properties</a></div>'
+        '</body></html>'
+    )
+
+
+class FixtureSite:
+    """Serves ``pages`` listing pages and their detail pages on a background thread."""
+
+    def __init__(self, pages=100, host='127.0.0.1', port=0, seed=0, delay=0.0):
+        self.pages = pages
+        self.seed = seed
+        self.delay = delay
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                if site.delay:
+                    time.sleep(site.delay)
+                path = urlsplit(self.path).path
+                body = None
+                page_match = _PAGE_PATH.match(path)
+                detail_match = _DETAIL_PATH.match(path)
+                if page_match:
+                    page = int(page_match.group(1) or 1)
+                    if page <= site.pages:
+                        body = render_listing_page(page, site.pages, site.url, site.seed)
+                elif detail_match:
+                    index = int(detail_match.group(1)) - FIRST_PROPERTY_ID
+                    if 0 <= index < site.pages * CARDS_PER_PAGE:
+                        body = render_detail_page(index, site.seed)
+                data = (body or '<html><body>Not found</body></html>').encode('utf-8')
+                self.send_response(200 if body else 404)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def listing_url(self):
+        return self.url + LISTING_PATH
+
+    def detail_url(self, index):
+        return f"{self.url}/property/details-{FIRST_PROPERTY_ID + index}.html"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve a synthetic Bayut-like site for crawler benchmarks")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--pages', type=int, default=100, help="Listing pages (24 cards each)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--delay-ms', type=float, default=0, help="Added latency per response")
+    args = parser.parse_args()
+
+    site = FixtureSite(args.pages, args.host, args.port, args.seed, args.delay_ms / 1000)
+    print(f"Serving {args.pages} listing pages at {site.listing_url}")
+    try:
+        site.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,80 @@
+"""Fill ``properties`` with synthetic listings for the benchmarks.
+
+Listings go through the bulk loader (``src.processor.loader``): worker
+processes generate and clean them, and each chunk is ``COPY``-ed into a
+staging table and merged with one set-based upsert, so 10M rows load in
+minutes. The rollups are rebuilt afterwards.
+"""
+from datetime import timedelta
+import argparse
+import logging
+import multiprocessing
+import os
+import time
+from sqlalchemy import create_engine, text
+from benchmarks.synthetic import EPOCH, synthetic_listing
+from src.api.config import settings
+from src.processor.backfill import sync_schema
+from src.processor.loader import load, prepare_chunk, refresh_rollups
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SIZES = {'10k': 10_000, '1m': 1_000_000, '10m': 10_000_000}
+
+
+def synthetic_row(index, seed=0):
+    """Listing ``index`` with creation and update times scattered over about 19 months."""
+    listing = synthetic_listing(index, seed)
+    listing['created_at'] = listing['updated_at'] = EPOCH + timedelta(seconds=index * 7919 % 50_000_000)
+    return listing
+
+
+def _prepare_range(chunk):
+    first, last, seed = chunk
+    return prepare_chunk([synthetic_row(index, seed) for index in range(first, last)])
+
+
+def generate(engine, rows, seed=0, start=0, chunk_size=50_000, workers=None):
+    """Load listings ``start`` to ``start + rows``; returns ``(written, unchanged)``.
+
+    ``workers`` processes build the chunks while this one copies them in.
+    """
+    chunks = [
+        (first, min(first + chunk_size, start + rows), seed)
+        for first in range(start, start + rows, chunk_size)
+    ]
+    with multiprocessing.Pool(workers or os.cpu_count()) as pool:
+        return load(engine, pool.imap(_prepare_range, chunks))
+
+
+def reset(engine):
+    with engine.begin() as connection:
+        connection.execute(text(
+            'TRUNCATE properties, price_history, price_trend_buckets, region_stats, price_sketches RESTART IDENTITY'
+        ))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load synthetic listings into the properties table")
+    parser.add_argument('--size', choices=SIZES, default='10k')
+    parser.add_argument('--rows', type=int, help="Exact row count (overrides --size)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--chunk-size', type=int, default=50_000, help="Rows per COPY")
+    parser.add_argument('--workers', type=int, help="Processes generating rows (default: CPU count)")
+    parser.add_argument('--reset', action='store_true', help="Empty the listing and rollup tables first")
+    args = parser.parse_args()
+
+    engine = create_engine(settings.database_url)
+    try:
+        sync_schema(engine)
+        if args.reset:
+            reset(engine)
+        started = time.perf_counter()
+        rows = args.rows or SIZES[args.size]
+        written, _ = generate(engine, rows, args.seed, chunk_size=args.chunk_size, workers=args.workers)
+        logger.info(f"Loaded {written} listings in {time.perf_counter() - started:.1f}s")
+        refresh_rollups(engine)
+        logger.info(f"Done in {time.perf_counter() - started:.1f}s")
+    finally:
+        engine.dispose()
@@ -0,0 +1,116 @@
+"""Run the benchmark suites and save the results as JSON for regression comparison.
+
+Each run writes ``benchmarks/results/<timestamp>-<revision>.json``. With
+``--compare`` every metric is checked against an earlier result file:
+``*_per_sec`` metrics regress when they drop, ``*_ms`` metrics when they rise.
+"""
+from datetime import datetime, timezone
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+SUITES = ('crawler', 'ingest', 'api', 'api_uncached')
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def run_suite(name, args):
+    # Imported per suite so the crawler benchmark runs without a database
+    if name == 'crawler':
+        from benchmarks import bench_crawler
+        return bench_crawler.run(args.pages, args.details, args.concurrency)
+    if name == 'ingest':
+        from benchmarks import bench_ingest
+        return bench_ingest.run(args.rows, args.batch_size, args.details, args.workers)
+    from benchmarks import bench_api
+    return bench_api.run(args.iterations, cache=name == 'api', base_url=args.url)
+
+
+def flatten(results, prefix=''):
+    """``{'api./analysis/summary.p50_ms': 1.2, ...}`` from the nested results."""
+    metrics = {}
+    for key, value in results.items():
+        if isinstance(value, dict):
+            metrics.update(flatten(value, f"{prefix}{key}."))
+        elif isinstance(value, (int, float)):
+            metrics[f"{prefix}{key}"] = value
+    return metrics
+
+
+def compare(base, current, threshold):
+    """Print the change of every shared metric; returns the metrics that regressed by more than ``threshold``."""
+    base_metrics = flatten(base['suites'])
+    regressions = []
+    for name, value in flatten(current['suites']).items():
+        if name not in base_metrics or not base_metrics[name]:
+            continue
+        change = (value - base_metrics[name]) / base_metrics[name]
+        if name.endswith('_per_sec'):
+            regressed = change < -threshold
+        elif name.endswith('_ms'):
+            regressed = change > threshold
+        else:
+            continue
+        if regressed:
+            regressions.append(name)
+        marker = '  REGRESSION' if regressed else ''
+        print(f"{name}: {base_metrics[name]:.2f} -> {value:.2f} ({change:+.1%}){marker}")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the benchmark suites and save the results")
+    # No choices=: argparse checks the empty default against them and rejects it
+    parser.add_argument('suites', nargs='*', help=f"Suites to run: {', '.join(SUITES)} (default: all)")
+    parser.add_argument('--pages', type=int, default=50, help="Crawler: listing pages")
+    parser.add_argument('--details', type=int, default=500, help="Crawler and ingest: detail pages/tasks")
+    parser.add_argument('--concurrency', type=int, default=8, help="Crawler: concurrent requests")
+    parser.add_argument('--rows', type=int, default=5000, help="Ingest: listings sent in batches")
+    parser.add_argument('--batch-size', type=int, default=500, help="Ingest: listings per batch task")
+    parser.add_argument('--workers', type=int, default=4, help="Ingest: processes sending batches at once")
+    parser.add_argument('--iterations', type=int, default=100, help="API: requests per endpoint")
+    parser.add_argument('--url', help="API: base URL of a running server (default: in-process)")
+    parser.add_argument('--output', help="Result file (default: benchmarks/results/<timestamp>-<revision>.json)")
+    parser.add_argument('--compare', help="Earlier result file to compare against")
+    parser.add_argument('--threshold', type=float, default=0.1, help="Relative change counted as a regression")
+    args = parser.parse_args()
+    unknown = [suite for suite in args.suites if suite not in SUITES]
+    if unknown:
+        parser.error(f"unknown suites: {', '.join(unknown)} (choose from {', '.join(SUITES)})")
+
+    started = datetime.now(timezone.utc)
+    revision = git_revision()
+    report = {
+        'timestamp': started.isoformat(),
+        'revision': revision,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'suites': {},
+    }
+    for suite in args.suites or SUITES:
+        print(f"Running {suite} benchmark...", file=sys.stderr)
+        report['suites'][suite] = run_suite(suite, args)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{started:%Y%m%dT%H%M%S}-{revision}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Saved results to {output}", file=sys.stderr)
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(json.load(f), report, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} metrics regressed by more than {args.threshold:.0%}", file=sys.stderr)
+            sys.exit(1)
@@ -0,0 +1,63 @@
+"""Deterministic synthetic listings shaped like the crawler's scraped dicts."""
+from datetime import datetime, timedelta
+import random
+
+# (region, locality, latitude, longitude, price per sqft in AED)
+AREAS = [
+    ('Dubai', 'Dubai Marina', 25.0805, 55.1403, 1900),
+    ('Dubai', 'Downtown Dubai', 25.1972, 55.2744, 2600),
+    ('Dubai', 'Jumeirah Village Circle', 25.0606, 55.2094, 1100),
+    ('Dubai', 'Business Bay', 25.1850, 55.2650, 1800),
+    ('Dubai', 'Palm Jumeirah', 25.1124, 55.1390, 3200),
+    ('Abu Dhabi', 'Al Reem Island', 24.4990, 54.4060, 1200),
+    ('Abu Dhabi', 'Yas Island', 24.4960, 54.6030, 1300),
+    ('Sharjah', 'Al Majaz', 25.3250, 55.3840, 650),
+    ('Ajman', 'Al Nuaimiya', 25.3890, 55.4600, 500),
+    ('Ras Al Khaimah', 'Al Marjan Island', 25.6700, 55.7400, 1000),
+]
+PROPERTY_TYPES = ['Apartment', 'Villa', 'Townhouse', 'Penthouse']
+BEDS = ['Studio', '1', '2', '3', '4', '5', '7+']
+AMENITIES = ['Balcony', 'Built in Wardrobes', 'Central A/C', 'Covered Parking', 'Gym', 'Shared Pool', 'Security']
+EPOCH = datetime(2024, 1, 1)
+
+
+def synthetic_listing(index, seed=0):
+    """The scraped dict for listing ``index``; the same ``(index, seed)`` always gives the same listing."""
+    rng = random.Random(seed * 1_000_003 + index)
+    region, locality, latitude, longitude, price_per_sqft = rng.choice(AREAS)
+    beds = rng.choice(BEDS)
+    property_type = rng.choice(PROPERTY_TYPES)
+    area = rng.randint(350, 900) * (1 + BEDS.index(beds) // 2)
+    price = round(area * price_per_sqft * rng.lognormvariate(0, 0.25), -3)
+    property_id = str(10_000_000 + index)
+    trucheck_date = None
+    if rng.random() < 0.4:
+        trucheck_date = (EPOCH + timedelta(days=rng.randint(0, 600))).strftime('%d %B %Y')
+    return {
+        'property_id': property_id,
+        'title': f"{beds} {'bed ' if beds != 'Studio' else ''}{property_type.lower()} in {locality}",
+        'property_type': property_type,
+        'price': f"{int(price):,}",
+        'currency': 'AED',
+        'purpose': 'For Sale',
+        'country': 'UAE',
+        'region': region,
+        'location': locality,
+        'beds': beds,
+        'baths': str(rng.randint(1, 6)),
+        'area': f"{area:,} sqft",
+        'latitude': round(latitude + rng.gauss(0, 0.02), 6),
+        'longitude': round(longitude + rng.gauss(0, 0.02), 6),
+        'image_url': f"https://images.example.invalid/{property_id}.jpg",
+        'reference': f"REF-{property_id}",
+        'furnishing': rng.choice(['Furnished', 'Unfurnished']),
+        'completion_status': rng.choice(['Ready', 'Off-Plan']),
+        'trucheck_date': trucheck_date,
+        'agent_name': f"Agent {rng.randint(1, 500)}",
+        'agency_name': f"Agency {rng.randint(1, 80)}",
+        'description': f"Spacious {beds} unit in {locality}.\nFeatures & Amenities:\n" + '\n'.join(
+            f"➤ {amenity}" for amenity in rng.sample(AMENITIES, 4)
+        ),
+        'features': {'General': rng.sample(AMENITIES, 4)},
+        'crawl_timestamp': (EPOCH + timedelta(minutes=index)).isoformat(),
+    }
@@ -0,0 +1,109 @@
+from collections import OrderedDict
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+import json
+import time
+from src.api.config import settings
+from src.processor.data_version import data_version_query
+
+
+class InProcessCache:
+    """LRU cache with a per-entry TTL, local to one API process."""
+
+    def __init__(self, max_entries=256, ttl=300):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+
+    async def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key, value):
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+class RedisCache:
+    """Cache shared by every API worker, stored in Redis with a TTL.
+
+    Size is bounded by the server's ``maxmemory`` policy (use
+    ``allkeys-lru``). ``client`` may be any ``redis.asyncio``-compatible
+    client, such as a fakeredis instance in local setups.
+    """
+
+    def __init__(self, url=None, ttl=300, prefix='analysis:', client=None):
+        if client is None:
+            try:
+                import redis.asyncio as redis
+            except ImportError as e:
+                raise RuntimeError("The redis cache backend needs the redis package (pip install redis)") from e
+            client = redis.from_url(url)
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+
+    async def get(self, key):
+        return await self.client.get(self.prefix + key)
+
+    async def set(self, key, value):
+        await self.client.set(self.prefix + key, value, ex=int(self.ttl))
+
+
+class ResponseCache:
+    """Caches JSON responses per URL and data version, and answers ``If-None-Match`` with 304.
+
+    The processor bumps the data version in every transaction that changes
+    listings, so entries for an older version are never served again; the
+    backend's TTL and size bound clean them up. The version itself is re-read
+    at most every ``version_check_interval`` seconds.
+    """
+
+    def __init__(self, backend, version_check_interval=1.0):
+        self.backend = backend
+        self.version_check_interval = version_check_interval
+        self._version = None
+        self._version_checked_at = 0.0
+
+    async def data_version(self, session):
+        now = time.monotonic()
+        if self._version is None or now - self._version_checked_at >= self.version_check_interval:
+            result = await session.execute(data_version_query())
+            self._version = result.scalar() or 0
+            self._version_checked_at = now
+        return self._version
+
+    async def respond(self, request: Request, session, compute):
+        """Serve ``await compute()`` for this request as cached JSON, or a 304 when the client is current."""
+        version = await self.data_version(session)
+        etag = f'"{version}"'
+        headers = {'ETag': etag, 'Cache-Control': 'no-cache'}
+        if etag in request.headers.get('if-none-match', ''):
+            return Response(status_code=304, headers=headers)
+
+        key = f"{request.url.path}?{request.url.query}@{version}"
+        body = await self.backend.get(key)
+        if body is None:
+            body = json.dumps(jsonable_encoder(await compute()), separators=(',', ':')).encode('utf-8')
+            await self.backend.set(key, body)
+        return Response(content=body, media_type='application/json', headers=headers)
+
+
+def create_cache_backend():
+    if settings.cache_backend == 'redis':
+        return RedisCache(settings.redis_url, ttl=settings.cache_ttl)
+    return InProcessCache(max_entries=settings.cache_max_entries, ttl=settings.cache_ttl)
+
+
+response_cache = ResponseCache(
+    create_cache_backend(), version_check_interval=settings.cache_version_check_interval
+)
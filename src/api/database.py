@@ -0,0 +1,30 @@
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from src.api.config import settings
+from src.metrics import instrument_engine
+
+
+def async_database_url(database_url):
+    """``settings.database_url`` with its driver swapped for asyncpg."""
+    url = make_url(database_url)
+    if url.get_backend_name() == 'postgresql':
+        url = url.set(drivername='postgresql+asyncpg')
+    return url
+
+
+engine = create_async_engine(
+    async_database_url(settings.database_url),
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
+    pool_timeout=settings.db_pool_timeout,
+    pool_recycle=settings.db_pool_recycle,
+    pool_pre_ping=True,
+)
+instrument_engine(engine.sync_engine)
+SessionLocal = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+
+async def get_session():
+    """Request-scoped session dependency; the connection goes back to the pool when the response is sent."""
+    async with SessionLocal() as session:
+        yield session
@@ -1,13 +1,23 @@
 import uvicorn
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
-from src.api.routers import analysis
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+from src.api.routers import analysis, listings
 from src.api.middleware.error_handler import catch_exceptions_middleware
+from src.api.middleware.metrics import metrics_middleware
 from src.api.config import settings
+from src.api.database import engine
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    await engine.dispose()
 
 app = FastAPI(
     title=settings.app_name,
     description="API for real estate property analysis",
+    lifespan=lifespan,
 )
 
 app.add_middleware(
@@ -18,8 +28,11 @@ app.add_middleware(
     allow_headers=["*"],
 )
 app.middleware("http")(catch_exceptions_middleware)
+# Added last so it runs first and times the error handler as well
+app.middleware("http")(metrics_middleware)
 
 app.include_router(analysis.router)
+app.include_router(listings.router)
 
 @app.get("/")
 async def root():
@@ -29,6 +42,11 @@ async def root():
 async def health_check():
     return {"status": "healthy"}
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics of this API process."""
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
 if __name__ == "__main__":
     uvicorn.run(
         "src.api.main:app",
@@ -0,0 +1,18 @@
+from time import perf_counter
+from fastapi import Request
+from src.metrics import HTTP_REQUEST_SECONDS
+
+async def metrics_middleware(request: Request, call_next):
+    started = perf_counter()
+    # An exception escaping the app becomes a 500 further out
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+        return response
+    finally:
+        # The route template rather than the raw path keeps label cardinality bounded
+        route = request.scope.get('route')
+        HTTP_REQUEST_SECONDS.labels(
+            request.method, route.path if route is not None else 'unmatched', str(status_code)
+        ).observe(perf_counter() - started)
@@ -0,0 +1,254 @@
+from datetime import datetime
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy import and_, func, or_, select, tuple_
+import base64
+import binascii
+import json
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.api.cache import response_cache
+from src.api.database import SessionLocal, get_session
+from src.models.property import Property
+from src.processor.export import csv_chunk, csv_header, export_columns, export_query, listing_filters, ndjson_chunk
+from src.processor.geo import EARTH_RADIUS_KM, cover_bbox, decode_geohash, radius_box
+
+router = APIRouter(
+    prefix="/listings",
+    tags=["listings"],
+    responses={404: {"description": "Not found"}},
+)
+
+LISTING_COLUMNS = [
+    Property.property_id,
+    Property.title,
+    Property.price_aed,
+    Property.area_sqft,
+    Property.beds_int,
+    Property.baths_int,
+    Property.property_type,
+    Property.region,
+    Property.latitude,
+    Property.longitude,
+]
+
+def _encode_cursor(updated_at, row_id):
+    payload = json.dumps([updated_at.isoformat(), row_id]).encode('utf-8')
+    return base64.urlsafe_b64encode(payload).decode('ascii')
+
+def _decode_cursor(cursor):
+    try:
+        updated_at, row_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        return datetime.fromisoformat(updated_at), int(row_id)
+    except (binascii.Error, UnicodeError, ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def _in_box(min_lat, min_lon, max_lat, max_lon):
+    """Geohash prefix ranges covering the box, narrowed to the exact coordinates."""
+    # '~' sorts after every base32 character, so [cell, cell~) holds exactly the cell's geohashes
+    cells = [
+        and_(Property.geohash >= cell, Property.geohash < cell + '~')
+        for cell in cover_bbox(min_lat, min_lon, max_lat, max_lon)
+    ]
+    return [
+        or_(*cells),
+        Property.latitude.between(min_lat, max_lat),
+        Property.longitude.between(min_lon, max_lon),
+    ]
+
+def _distance_km(lat, lon):
+    """SQL haversine distance from a point, as ``haversine_km`` computes it."""
+    lat1, lon1 = func.radians(lat), func.radians(lon)
+    lat2, lon2 = func.radians(Property.latitude), func.radians(Property.longitude)
+    a = (
+        func.power(func.sin((lat2 - lat1) / 2), 2)
+        + func.cos(lat1) * func.cos(lat2) * func.power(func.sin((lon2 - lon1) / 2), 2)
+    )
+    # least() keeps rounding from pushing asin's argument past 1
+    return 2 * EARTH_RADIUS_KM * func.asin(func.least(func.sqrt(a), 1))
+
+def _check_box(min_lat, min_lon, max_lat, max_lon):
+    if min_lat > max_lat or min_lon > max_lon:
+        raise HTTPException(status_code=400, detail="Bounding box minimums must not exceed its maximums")
+
+@router.get("")
+async def search_listings(
+    region: Optional[str] = None,
+    location: Optional[str] = None,
+    property_type: Optional[str] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    beds: Optional[int] = None,
+    truchecked: Optional[bool] = None,
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(50, ge=1, le=500),
+    session: AsyncSession = Depends(get_session),
+):
+    """Listings, most recently updated first, paginated by a ``(updated_at, id)`` keyset cursor.
+
+    Each page seeks straight to the cursor through an ``(…, updated_at, id)``
+    index, so page 1000 costs the same as page 1.
+    """
+    columns = [*LISTING_COLUMNS, Property.location, Property.trucheck_date, Property.updated_at, Property.id]
+    query = select(*columns).where(*listing_filters(
+        region=region, location=location, property_type=property_type,
+        min_price=min_price, max_price=max_price, beds=beds, truchecked=truchecked,
+    ))
+    if cursor:
+        query = query.where(tuple_(Property.updated_at, Property.id) < tuple_(*_decode_cursor(cursor)))
+    query = query.order_by(Property.updated_at.desc(), Property.id.desc()).limit(limit + 1)
+
+    rows = (await session.execute(query)).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = _encode_cursor(rows[-1].updated_at, rows[-1].id)
+    listings = []
+    for row in rows:
+        listing = row._asdict()
+        del listing['id']
+        listings.append(listing)
+    return {"listings": listings, "next_cursor": next_cursor}
+
+@router.get("/nearby")
+async def get_nearby(
+    lat: float = Query(..., ge=-90, le=90),
+    lon: float = Query(..., ge=-180, le=180),
+    radius_km: float = Query(1.0, gt=0, le=50),
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    beds: Optional[int] = None,
+    property_type: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    session: AsyncSession = Depends(get_session),
+):
+    """Listings within ``radius_km`` of a point, nearest first.
+
+    The distance filter, ordering and ``limit`` run in SQL; ``count`` is the
+    number of matches, which may exceed the listings returned.
+    """
+    distance = _distance_km(lat, lon).label('distance_km')
+    query = select(*LISTING_COLUMNS, distance, func.count().over().label('total')).where(
+        *_in_box(*radius_box(lat, lon, radius_km)),
+        distance <= radius_km,
+        *listing_filters(min_price=min_price, max_price=max_price, beds=beds, property_type=property_type),
+    ).order_by(distance).limit(limit)
+    rows = (await session.execute(query)).all()
+    listings = []
+    for row in rows:
+        listing = row._asdict()
+        del listing['total']
+        listing['distance_km'] = round(listing['distance_km'], 3)
+        listings.append(listing)
+    return {"count": rows[0].total if rows else 0, "listings": listings}
+
+@router.get("/bbox")
+async def get_bbox(
+    min_lat: float = Query(..., ge=-90, le=90),
+    min_lon: float = Query(..., ge=-180, le=180),
+    max_lat: float = Query(..., ge=-90, le=90),
+    max_lon: float = Query(..., ge=-180, le=180),
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    beds: Optional[int] = None,
+    property_type: Optional[str] = None,
+    limit: int = Query(500, ge=1, le=5000),
+    session: AsyncSession = Depends(get_session),
+):
+    """Listings inside a bounding box, most recently updated first.
+
+    ``count`` is the number of matches, which may exceed the listings returned.
+    """
+    _check_box(min_lat, min_lon, max_lat, max_lon)
+    query = select(*LISTING_COLUMNS, func.count().over().label('total')).where(
+        *_in_box(min_lat, min_lon, max_lat, max_lon),
+        *listing_filters(min_price=min_price, max_price=max_price, beds=beds, property_type=property_type),
+    ).order_by(Property.updated_at.desc(), Property.id.desc()).limit(limit)
+    rows = (await session.execute(query)).all()
+    listings = []
+    for row in rows:
+        listing = row._asdict()
+        del listing['total']
+        listings.append(listing)
+    return {"count": rows[0].total if rows else 0, "listings": listings}
+
+@router.get("/heatmap")
+async def get_heatmap(
+    request: Request,
+    precision: int = Query(5, ge=1, le=8),
+    min_lat: float = Query(-90, ge=-90, le=90),
+    min_lon: float = Query(-180, ge=-180, le=180),
+    max_lat: float = Query(90, ge=-90, le=90),
+    max_lon: float = Query(180, ge=-180, le=180),
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    beds: Optional[int] = None,
+    property_type: Optional[str] = None,
+    session: AsyncSession = Depends(get_session),
+):
+    """Listing count and average prices per geohash cell of the given precision."""
+    _check_box(min_lat, min_lon, max_lat, max_lon)
+
+    async def compute():
+        cell = func.left(Property.geohash, precision).label('cell')
+        query = select(
+            cell,
+            func.count().label('count'),
+            func.avg(Property.price_aed).label('avg_price'),
+            func.avg(Property.price_aed / func.nullif(Property.area_sqft, 0)).label('avg_price_per_sqft'),
+        ).where(
+            Property.geohash.isnot(None),
+            *_in_box(min_lat, min_lon, max_lat, max_lon),
+            *listing_filters(min_price=min_price, max_price=max_price, beds=beds, property_type=property_type),
+        ).group_by(cell).order_by(cell)
+        result = await session.execute(query)
+        cells = []
+        for row in result:
+            latitude, longitude = decode_geohash(row.cell)
+            cells.append({
+                'geohash': row.cell,
+                'latitude': latitude,
+                'longitude': longitude,
+                'count': row.count,
+                'avg_price': row.avg_price,
+                'avg_price_per_sqft': row.avg_price_per_sqft,
+            })
+        return {"precision": precision, "cells": cells}
+
+    return await response_cache.respond(request, session, compute)
+
+@router.get("/export")
+async def export_listings(
+    format: Literal['ndjson', 'csv'] = 'ndjson',
+    columns: Optional[str] = Query(None, description="Comma-separated columns (default: all)"),
+    region: Optional[str] = None,
+    location: Optional[str] = None,
+    property_type: Optional[str] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    beds: Optional[int] = None,
+    truchecked: Optional[bool] = None,
+):
+    """Stream every matching listing in ``id`` order; memory use does not grow with the result."""
+    try:
+        selected = export_columns(columns.split(',') if columns else None)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    names = [column.name for column in selected]
+    query = export_query(selected, listing_filters(
+        region=region, location=location, property_type=property_type,
+        min_price=min_price, max_price=max_price, beds=beds, truchecked=truchecked,
+    ))
+
+    async def body():
+        # Own session: request-scoped dependencies are closed before a streamed body is sent
+        async with SessionLocal() as session:
+            result = await session.stream(query)
+            if format == 'csv':
+                yield csv_header(names)
+            async for rows in result.partitions():
+                yield ndjson_chunk(names, rows) if format == 'ndjson' else csv_chunk(rows)
+
+    media_type = 'application/x-ndjson' if format == 'ndjson' else 'text/csv'
+    headers = {'Content-Disposition': f'attachment; filename="listings.{format}"'}
+    return StreamingResponse(body(), media_type=media_type, headers=headers)
@@ -0,0 +1,139 @@
+import fcntl
+import json
+import os
+import threading
+from datetime import datetime
+import zstandard
+
+
+class PageArchive:
+    """Append-only, compressed archive of raw page HTML.
+
+    Each page is written as an independent zstd frame to the current segment
+    file (``segment-000001.zst``, ...), which rolls over at ``segment_size``
+    bytes. A frame holds a JSON header line (kind, url, metadata) followed by
+    the HTML. ``index.jsonl`` gets one line per page with the ``property_id``,
+    crawl time and the frame's segment/offset/length, and is only written once
+    the frame is on disk, so a crash never leaves the index pointing at a
+    partial frame.
+
+    Several crawler processes can share an archive: each append holds an
+    exclusive ``flock`` on ``archive.lock`` while it writes, and picks up
+    segments another process rolled over to.
+    """
+
+    INDEX_NAME = 'index.jsonl'
+    LOCK_NAME = 'archive.lock'
+
+    def __init__(self, path, segment_size=256 * 1024 * 1024, level=3):
+        self.path = path
+        self.segment_size = segment_size
+        self.level = level
+        self._lock = threading.Lock()
+        self._compressor = None
+        self._segment = None
+        self._segment_file = None
+        self._index_file = None
+        self._lock_file = None
+
+    def _open(self):
+        os.makedirs(self.path, exist_ok=True)
+        self._compressor = zstandard.ZstdCompressor(level=self.level)
+        segments = self.segments()
+        number = self._segment_number(segments[-1]) if segments else 1
+        self._open_segment(number)
+        self._index_file = open(os.path.join(self.path, self.INDEX_NAME), 'a', encoding='utf-8')
+        self._lock_file = open(os.path.join(self.path, self.LOCK_NAME), 'a')
+
+    def _open_segment(self, number):
+        if self._segment_file is not None:
+            self._segment_file.close()
+        self._segment = f'segment-{number:06d}.zst'
+        self._segment_file = open(os.path.join(self.path, self._segment), 'ab')
+
+    @staticmethod
+    def _segment_number(segment):
+        return int(segment[len('segment-'):-len('.zst')])
+
+    def segments(self):
+        if not os.path.isdir(self.path):
+            return []
+        return sorted(name for name in os.listdir(self.path) if name.startswith('segment-') and name.endswith('.zst'))
+
+    def append(self, kind, url, html, property_id=None, meta=None):
+        """Compress and store one page; ``kind`` is ``listing`` or ``detail``."""
+        crawled_at = datetime.now().isoformat()
+        header = json.dumps({'kind': kind, 'url': url, 'crawled_at': crawled_at, 'meta': meta or {}})
+        payload = f'{header}\n{html}'.encode('utf-8')
+
+        with self._lock:
+            if self._segment_file is None:
+                self._open()
+            frame = self._compressor.compress(payload)
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX)
+            try:
+                latest = self.segments()[-1]
+                if latest != self._segment:
+                    # Another process rolled over
+                    self._open_segment(self._segment_number(latest))
+                # Other processes append too, so the file position is stale
+                offset = self._segment_file.seek(0, os.SEEK_END)
+                if offset and offset + len(frame) > self.segment_size:
+                    self._open_segment(self._segment_number(self._segment) + 1)
+                    offset = 0
+                self._segment_file.write(frame)
+                self._segment_file.flush()
+
+                self._index_file.write(json.dumps({
+                    'property_id': property_id,
+                    'kind': kind,
+                    'url': url,
+                    'crawled_at': crawled_at,
+                    'segment': self._segment,
+                    'offset': offset,
+                    'length': len(frame),
+                }) + '\n')
+                self._index_file.flush()
+            finally:
+                fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+
+    def close(self):
+        with self._lock:
+            if self._segment_file is not None:
+                self._segment_file.close()
+                self._segment_file = None
+            if self._index_file is not None:
+                self._index_file.close()
+                self._index_file = None
+            if self._lock_file is not None:
+                self._lock_file.close()
+                self._lock_file = None
+
+    def iter_index(self, kind=None, property_ids=None, since=None):
+        """Yield index entries, optionally filtered by kind, property IDs and crawl time."""
+        index_path = os.path.join(self.path, self.INDEX_NAME)
+        if not os.path.exists(index_path):
+            return
+        with open(index_path, encoding='utf-8') as index_file:
+            for line in index_file:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                if kind and entry['kind'] != kind:
+                    continue
+                if property_ids and entry['property_id'] not in property_ids:
+                    continue
+                if since and entry['crawled_at'] < since:
+                    continue
+                yield entry
+
+
+def read_frames(archive_path, segment, entries):
+    """Yield ``(header, html)`` for the given index entries of one segment, in file order."""
+    decompressor = zstandard.ZstdDecompressor()
+    with open(os.path.join(archive_path, segment), 'rb') as segment_file:
+        for entry in sorted(entries, key=lambda entry: entry['offset']):
+            segment_file.seek(entry['offset'])
+            payload = decompressor.decompress(segment_file.read(entry['length'])).decode('utf-8')
+            header, html = payload.split('\n', 1)
+            yield json.loads(header), html
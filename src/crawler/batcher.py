@@ -0,0 +1,59 @@
+import logging
+import threading
+import time
+from src.processor.celery_tasks import process_property_batch
+
+logger = logging.getLogger(__name__)
+
+
+class PropertyBatcher:
+    """Buffers scraped properties and sends them as ``process_property_batch`` messages.
+
+    A batch is flushed once it holds ``max_size`` properties or its oldest
+    property has waited ``max_delay`` seconds. Safe to share between pool
+    workers; call :meth:`close` to flush what is left.
+    """
+
+    def __init__(self, max_size=100, max_delay=5.0):
+        self.max_size = max_size
+        self.max_delay = max_delay
+        self._buffer = []
+        self._oldest = None
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._timer = threading.Thread(target=self._flush_periodically, name='property-batcher', daemon=True)
+        self._timer.start()
+
+    def add(self, property_data):
+        with self._lock:
+            if not self._buffer:
+                self._oldest = time.monotonic()
+            self._buffer.append(property_data)
+            batch = self._take() if len(self._buffer) >= self.max_size else None
+        self._send(batch)
+
+    def flush(self):
+        with self._lock:
+            batch = self._take()
+        self._send(batch)
+
+    def close(self):
+        self._stopped.set()
+        self._timer.join()
+        self.flush()
+
+    def _take(self):
+        batch, self._buffer, self._oldest = self._buffer, [], None
+        return batch
+
+    def _send(self, batch):
+        if batch:
+            process_property_batch.delay(batch)
+            logger.info(f"Queued batch of {len(batch)} properties")
+
+    def _flush_periodically(self):
+        while not self._stopped.wait(self.max_delay / 2):
+            with self._lock:
+                due = self._oldest is not None and time.monotonic() - self._oldest >= self.max_delay
+                batch = self._take() if due else None
+            self._send(batch)
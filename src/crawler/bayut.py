@@ -1,11 +1,27 @@
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, StaleElementReferenceException, NoSuchElementException, WebDriverException
 from datetime import datetime
+from urllib.parse import urljoin, urlsplit, urlunsplit
+import argparse
+import asyncio
 import json
+import math
+import re
+import httpx
+import lxml.html
+from src.crawler.archive import PageArchive
+from src.crawler.batcher import PropertyBatcher
+from src.crawler.browser import PROFILES, PageStats, create_driver
+from src.crawler.checkpoint import CrawlCheckpoint
+from src.crawler.extraction import (
+    AMENITY_DIALOG_SPEC, DETAIL_READY_SELECTORS, DETAIL_SPEC, EXTRACT_SCRIPT, apply_detail_result
+)
+from src.crawler.known_listings import KnownListingIndex
+from src.crawler.pool import DetailWorkerPool
+from src.crawler.rate_limiter import THROTTLE_STATUS_CODES, AdaptiveRateController, RateLimited, classify_exception
+from src.metrics import crawler_stage, start_exporter
 from src.processor.celery_tasks import process_property_details
 import time
 import logging
@@ -13,185 +29,507 @@ import logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+DEFAULT_BASE_URL = 'https://www.bayut.com/for-sale/property/dubai/?sort=date_desc'
+
+# Listing cards are usable once their JSON-LD block is in the DOM
+LISTING_READY_SELECTOR = 'ul li article script[type="application/ld+json"]'
+
+HTTP_HEADERS = {
+    'User-Agent': (
+        'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+        '(KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36'
+    ),
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.9',
+}
+
+
+def card_info_from_json_ld(data):
+    """Map a listing card's JSON-LD object to the model's field names."""
+    return {
+        'property_id': data['url'].split('-')[-1].replace('.html', ''),
+        'property_type': data.get('@type'),
+        'title': data.get('name'),
+        'latitude': data['geo']['latitude'],
+        'longitude': data['geo']['longitude'],
+        'area': data['floorSize']['value'].replace(',', '') if data.get('floorSize', {}).get('value') else None,
+        'beds': str(data['numberOfRooms']['value']) if data.get('numberOfRooms', {}).get('value') else None,
+        'baths': str(data.get('numberOfBathroomsTotal')),
+        'image_url': data.get('image', ''),
+        'country': data['address']['addressCountry'],
+        'location': data['address']['addressLocality'],
+        'region': data['address']['addressRegion'],
+        'crawl_timestamp': datetime.now().isoformat()
+    }
+
+
+def listing_page_url(base_url, page):
+    """Build the URL of a numbered listing page (``/page-N/`` before the query)."""
+    if page <= 1:
+        return base_url
+    parts = urlsplit(base_url)
+    path = f"{parts.path.rstrip('/')}/page-{page}/"
+    return urlunsplit((parts.scheme, parts.netloc, path, parts.query, parts.fragment))
+
+
+def parse_listing_page(html, page_url):
+    """Parse raw listing page HTML into ``(property_data, detail_url)`` pairs and the next page URL."""
+    doc = lxml.html.fromstring(html)
+    listings = []
+    for card in doc.cssselect('ul li article'):
+        scripts = card.cssselect('script[type="application/ld+json"]')
+        links = card.cssselect('a[href]')
+        if not scripts or not links:
+            continue
+        try:
+            property_data = card_info_from_json_ld(json.loads(scripts[0].text or ''))
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            print(f"Error extracting card info: {str(e)}")
+            continue
+        listings.append((property_data, urljoin(page_url, links[0].get('href'))))
+
+    next_url = None
+    next_links = doc.cssselect('a[title="Next"][href]')
+    if next_links:
+        next_url = urljoin(page_url, next_links[0].get('href'))
+    return listings, next_url
+
+
+def parse_page_count(html, cards_per_page=24):
+    """Estimate how many listing pages exist from the pagination links and result count."""
+    doc = lxml.html.fromstring(html)
+    pages = [1]
+    for link in doc.cssselect('a[href*="/page-"]'):
+        match = re.search(r'/page-(\d+)/', link.get('href'))
+        if match:
+            pages.append(int(match.group(1)))
+    match = re.search(r'of\s+([\d,]+)\s+(?:Properties|properties|results)', doc.text_content())
+    if match:
+        pages.append(math.ceil(int(match.group(1).replace(',', '')) / cards_per_page))
+    return max(pages)
+
+
+class BayutListingClient:
+    """Browser-less listing crawler.
+
+    Listing cards carry everything we need in their JSON-LD block, so listing
+    pages are fetched with an async HTTP client and parsed with lxml. Pages
+    are requested a window at a time using the ``/page-N/`` URL scheme; the
+    window follows the rate controller's current limit.
+    """
+
+    def __init__(self, base_url=DEFAULT_BASE_URL, concurrency=4, timeout=30, archive=None,
+                 rate_controller=None, max_retries=3, max_failed_pages=3):
+        self.base_url = base_url
+        self.timeout = timeout
+        self.archive = archive
+        self.rate_controller = rate_controller or AdaptiveRateController(initial=max(1, concurrency))
+        self.max_retries = max_retries
+        # Consecutive unfetchable pages after which the crawl gives up
+        self.max_failed_pages = max_failed_pages
+
+    async def _get(self, client, url):
+        async with self.rate_controller.async_slot():
+            with crawler_stage('page_load', 'listing'):
+                response = await client.get(url)
+            if response.status_code in THROTTLE_STATUS_CODES:
+                retry_after = response.headers.get('Retry-After', '')
+                raise RateLimited(response.status_code, float(retry_after) if retry_after.isdigit() else None)
+            if response.status_code != 404:
+                # Inside the slot, so a 5xx counts against the limit instead of as a success
+                response.raise_for_status()
+            return response
+
+    async def _fetch_page(self, client, page):
+        """``(url, listings, next_url)``; ``listings`` is None if the page could not be fetched."""
+        url = listing_page_url(self.base_url, page)
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = await self._get(client, url)
+                if response.status_code == 404:
+                    # Past the last page
+                    return url, [], None
+                break
+            except (httpx.HTTPError, RateLimited) as e:
+                # Throttling, 5xx, timeouts and transport errors are retried; other 4xx are not
+                if classify_exception(e) is None or attempt == self.max_retries:
+                    print(f"Error fetching listing page {url}: {str(e)}")
+                    return url, None, None
+                await asyncio.sleep(self.rate_controller.backoff(attempt))
+        if self.archive is not None:
+            self.archive.append('listing', url, response.text)
+        with crawler_stage('extract', 'listing'):
+            listings, next_url = parse_listing_page(response.text, str(response.url))
+        return url, listings, next_url
+
+    async def _fetch_window(self, client, first_page, last_page=None):
+        end = first_page + max(1, int(self.rate_controller.limit))
+        if last_page is not None:
+            end = min(end, last_page + 1)
+        pages = range(first_page, end)
+        return await asyncio.gather(*(self._fetch_page(client, page) for page in pages))
+
+    def iter_listing_pages(self, start_page=1, max_pages=None):
+        """Yield ``(page_url, listings)`` for each listing page until pagination ends.
+
+        Pagination ends on a page without a next link (or a 404). A page that
+        still fails after retries is yielded with no listings, so page
+        numbers stay aligned, and the crawl only gives up after
+        ``max_failed_pages`` of them in a row. With ``max_pages``, no page past
+        the last one is fetched, however wide the window.
+        """
+        loop = asyncio.new_event_loop()
+        client = httpx.AsyncClient(headers=HTTP_HEADERS, timeout=self.timeout, follow_redirects=True)
+        page = start_page
+        last_page = start_page + max_pages - 1 if max_pages else None
+        failed_pages = 0
+        try:
+            while True:
+                window = loop.run_until_complete(self._fetch_window(client, page, last_page))
+                for url, listings, next_url in window:
+                    page += 1
+                    if listings is None:
+                        failed_pages += 1
+                        if failed_pages >= self.max_failed_pages:
+                            print(f"Giving up after {failed_pages} listing pages in a row failed")
+                            return
+                        yield url, []
+                        continue
+                    failed_pages = 0
+                    if not listings and next_url is None:
+                        # Past the last page
+                        return
+                    yield url, listings
+                    if next_url is None or (max_pages and page - start_page >= max_pages):
+                        return
+        finally:
+            loop.run_until_complete(client.aclose())
+            loop.close()
+
+
 class BayutSeleniumScraper:
-    def __init__(self):
-        options = Options()
-        options.binary_location = r"C:\Program Files\BraveSoftware\Brave-Browser\Application\brave.exe"
-        options.add_argument('--no-sandbox')
-        options.add_argument('--disable-dev-shm-usage')
-        options.add_argument('--disable-gpu')
-        options.add_argument('--window-size=1920,1080')
-        options.add_experimental_option('excludeSwitches', ['enable-logging'])
-        
-        self.driver = webdriver.Chrome(options=options)
-        self.wait = WebDriverWait(self.driver, 30, poll_frequency=1)  # Increased timeout
-        self.base_url = 'https://www.bayut.com/for-sale/property/dubai/?sort=date_desc'
+    def __init__(self, base_url=DEFAULT_BASE_URL, listing_mode='browser', workers=1,
+                 pages_per_driver=50, detail_tab=True, incremental=False, stop_after_known_pages=3,
+                 profile='default', page_stats=None, archive=None, checkpoint=None, resume=False,
+                 rate_controller=None, max_retries=3, batcher=None):
+        self.base_url = base_url
+        self.listing_mode = listing_mode
+        self.workers = workers
+        self.pages_per_driver = pages_per_driver
+        # Incremental crawls skip listings already in the database and, since
+        # results are sorted by date, stop after a run of fully known pages.
+        self.incremental = incremental
+        self.stop_after_known_pages = stop_after_known_pages
+        self.known_listings = None
+        # Detail pages open in a second tab so the listing page stays loaded;
+        # pool workers have no listing page and navigate in place instead.
+        self.detail_tab = detail_tab
+        self.profile = profile
+        # Shared with pool workers when bytes/time per page are being reported
+        self.page_stats = page_stats
+        # Raw listing/detail HTML goes here for offline re-parsing (see src.crawler.replay)
+        self.archive = archive
+        # Progress is written to the checkpoint so a killed crawl can ``resume``
+        self.checkpoint = checkpoint
+        self.resume = resume
+        # One AIMD controller paces every fetch: listing pages, this browser and pool workers
+        self.rate_controller = rate_controller or AdaptiveRateController(initial=max(1, workers))
+        self.max_retries = max_retries
+        # Scraped properties are sent in batches when a batcher is given
+        self.batcher = batcher
+        self._driver = None
+        self.wait = None
+
+    @property
+    def driver(self):
+        """Start the browser on first use so HTTP listing mode only pays for it on detail pages."""
+        if self._driver is None:
+            self._driver = create_driver(self.profile)
+            self.wait = WebDriverWait(self._driver, 30, poll_frequency=0.25)
+        return self._driver
+
+    def driver_alive(self):
+        """Check whether the browser session still answers commands."""
+        if self._driver is None:
+            return False
+        try:
+            self._driver.execute_script('return 1')
+            return True
+        except WebDriverException:
+            return False
+
+    def restart_driver(self):
+        """Quit the current browser; the next ``driver`` access starts a fresh one."""
+        if self._driver is not None:
+            try:
+                self._driver.quit()
+            except Exception:
+                pass
+        self._driver = None
+        self.wait = None
+
+    def _create_detail_worker(self):
+        return BayutSeleniumScraper(base_url=self.base_url, detail_tab=False, profile=self.profile,
+                                    page_stats=self.page_stats, archive=self.archive,
+                                    rate_controller=self.rate_controller, max_retries=self.max_retries,
+                                    batcher=self.batcher)
+
+    def _start_pool(self):
+        if self.workers <= 1:
+            return None
+        pool = DetailWorkerPool(self._create_detail_worker, workers=self.workers,
+                                pages_per_driver=self.pages_per_driver,
+                                on_done=self._detail_finished)
+        pool.start()
+        return pool
+
+    def _shutdown(self, pool, completed):
+        if pool is not None:
+            pool.close(cancel=not completed)
+        self.restart_driver()
+        if self.page_stats is not None:
+            print(f"Page stats: {json.dumps(self.page_stats.report(), indent=2)}")
+        if self.archive is not None:
+            self.archive.close()
+        if self.batcher is not None:
+            self.batcher.close()
+
+    def scrape_details(self, details):
+        """Scrape the given ``(detail_url, property_data)`` pairs without walking listing pages."""
+        pool = self._start_pool()
+        completed = False
+        try:
+            for detail_url, property_data in details:
+                self._dispatch(pool, detail_url, property_data)
+            completed = True
+        finally:
+            self._shutdown(pool, completed)
 
     def scrape(self):
+        pool = self._start_pool()
+
+        if self.incremental:
+            self.known_listings = KnownListingIndex.from_database()
+            print(f"Loaded {len(self.known_listings)} known listings")
+        known_pages = 0
+
+        start_page, start_url, walk_listings, pending = 1, None, True, []
+        if self.checkpoint is not None:
+            if self.resume:
+                pending = self.checkpoint.pending()
+                print(f"Resuming after page {self.checkpoint.page_number}, retrying {len(pending)} detail pages")
+                if self.checkpoint.page_url:
+                    start_page, start_url = self.checkpoint.page_number, self.checkpoint.page_url
+                walk_listings = not self.checkpoint.completed
+            else:
+                self.checkpoint.reset()
+
+        completed = False
         try:
-            self.driver.get(self.base_url)
-            while True:
-                # Wait for listings to load
-                self.wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, 'ul li article')))
-                time.sleep(2)  # Extra wait for dynamic content
+            for detail_url, property_data in pending:
+                self._dispatch(pool, detail_url, property_data)
 
-                # Get all property cards
-                property_cards = self.driver.find_elements(By.CSS_SELECTOR, 'ul li article')
-                
-                for card in property_cards:
+            pages = self._iter_listing_pages(start_url=start_url, start_page=start_page) if walk_listings else []
+            for page_number, (page_url, listings) in enumerate(pages, start=start_page):
+                if start_url is not None and page_number == start_page:
+                    # The checkpointed page's listings were already handed out
+                    continue
+
+                if self.incremental:
+                    fresh_listings = self._filter_known(listings)
+                    if listings and not fresh_listings:
+                        known_pages += 1
+                        if known_pages >= self.stop_after_known_pages:
+                            print(f"Stopping after {known_pages} pages of known listings")
+                            break
+                    else:
+                        known_pages = 0
+                    listings = fresh_listings
+
+                if self.checkpoint is not None:
+                    self.checkpoint.page_started(page_number, page_url, listings)
+                for property_data, detail_url in listings:
+                    self._dispatch(pool, detail_url, property_data, checkpointed=True)
+            completed = True
+
+        finally:
+            self._shutdown(pool, completed)
+            if completed and self.checkpoint is not None:
+                self.checkpoint.mark_completed()
+
+    def _dispatch(self, pool, detail_url, property_data, checkpointed=False):
+        """Hand a detail page to the worker pool, or scrape it inline without one."""
+        if self.checkpoint is not None and not checkpointed:
+            self.checkpoint.detail_started(detail_url, property_data)
+        if pool is not None:
+            pool.submit(detail_url, property_data)
+            return
+        success = False
+        try:
+            # Visit detail page and get full info
+            success = self._get_property_details(detail_url, property_data)
+        except Exception as e:
+            print(f"Error processing property card: {str(e)}")
+        self._detail_finished(detail_url, property_data, success)
+
+    def _detail_finished(self, detail_url, property_data, success):
+        if self.checkpoint is not None:
+            self.checkpoint.detail_finished(detail_url, property_data, success)
+
+    def _filter_known(self, listings):
+        """Drop listings already stored (or already seen this run) and remember the rest."""
+        fresh_listings = []
+        for property_data, detail_url in listings:
+            property_id = property_data['property_id']
+            if property_id in self.known_listings:
+                continue
+            self.known_listings.add(property_id)
+            fresh_listings.append((property_data, detail_url))
+        return fresh_listings
+
+    def _iter_listing_pages(self, start_url=None, start_page=1, max_pages=None):
+        """Yield ``(page_url, listings)`` using the configured listing mode.
+
+        ``max_pages`` bounds the HTTP client's fetch window; the browser loads
+        one page at a time, so the caller just stops consuming.
+        """
+        if self.listing_mode == 'http':
+            client = BayutListingClient(self.base_url, archive=self.archive, rate_controller=self.rate_controller)
+            yield from client.iter_listing_pages(start_page=start_page, max_pages=max_pages)
+            return
+
+        started = time.monotonic()
+        with self.rate_controller.slot():
+            with crawler_stage('page_load', 'listing'):
+                self.driver.get(start_url or self.base_url)
+            with crawler_stage('wait', 'listing'):
+                self._wait_for_listing_cards()
+        while True:
+            if self.page_stats is not None:
+                self.page_stats.record(self.driver, self.driver.current_url, 'listing', started)
+            if self.archive is not None:
+                self.archive.append('listing', self.driver.current_url, self.driver.page_source)
+
+            # Collect basic info from every card before visiting detail pages
+            listings = []
+            cards = self.driver.find_elements(By.CSS_SELECTOR, 'ul li article')
+            with crawler_stage('extract', 'listing'):
+                for card in cards:
                     try:
-                        # Get basic info from card
                         property_data = self._extract_card_info(card)
                         if property_data is None:
                             continue
-                        
-                        # Get detail page URL
                         detail_url = card.find_element(By.CSS_SELECTOR, 'a').get_attribute('href')
-                        
-                        # Visit detail page and get full info
-                        self._get_property_details(detail_url, property_data)
-                        
+                        listings.append((property_data, detail_url))
                     except Exception as e:
                         print(f"Error processing property card: {str(e)}")
                         continue
 
-                # Try to go to next page
-                try:
-                    next_button = self.driver.find_element(By.CSS_SELECTOR, 'a[title="Next"]')
-                    if not next_button.is_enabled():
-                        break
-                    next_button.click()
-                    time.sleep(2)
-                except:
+            page_url = self.driver.current_url
+            yield page_url, listings
+
+            # Try to go to next page
+            try:
+                next_button = self.driver.find_element(By.CSS_SELECTOR, 'a[title="Next"]')
+                if not next_button.is_enabled():
                     break
+                started = time.monotonic()
+                with self.rate_controller.slot():
+                    with crawler_stage('page_load', 'listing'):
+                        next_button.click()
+                        self.wait.until(EC.url_changes(page_url))
+                    with crawler_stage('wait', 'listing'):
+                        # The URL can change before the old cards are replaced;
+                        # wait for them to go so the next read sees the new page
+                        if cards:
+                            self.wait.until(EC.staleness_of(cards[0]))
+                        self._wait_for_listing_cards()
+            except:
+                break
 
-        finally:
-            self.driver.quit()
+    def _wait_for_listing_cards(self):
+        # Wait until the cards' JSON-LD has rendered
+        self.wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, LISTING_READY_SELECTOR)))
 
     def _extract_card_info(self, card):
         """Extract information from the property card."""
         try:
             # Get JSON-LD data
             script = card.find_element(By.CSS_SELECTOR, 'script[type="application/ld+json"]').get_attribute('innerHTML')
-            data = json.loads(script)
-            
-            # Map the fields to match the model's field names exactly
-            return {
-                'property_id': data['url'].split('-')[-1].replace('.html', ''),
-                'property_type': data.get('@type'),
-                'title': data.get('name'),
-                'latitude': data['geo']['latitude'],
-                'longitude': data['geo']['longitude'],
-                'area': data['floorSize']['value'].replace(',', '') if data.get('floorSize', {}).get('value') else None,
-                'beds': str(data['numberOfRooms']['value']) if data.get('numberOfRooms', {}).get('value') else None,
-                'baths': str(data.get('numberOfBathroomsTotal')),
-                'image_url': data.get('image', ''),
-                'country': data['address']['addressCountry'],
-                'location': data['address']['addressLocality'],
-                'region': data['address']['addressRegion'],
-                'crawl_timestamp': datetime.now().isoformat()
-            }
+            return card_info_from_json_ld(json.loads(script))
         except Exception as e:
             print(f"Error extracting card info: {str(e)}")
             return None
 
     def _get_property_details(self, url, property_data):
         """Get detailed property information from property page."""
-        max_retries = 3
         retry_count = 0
+        card_data = dict(property_data)
         
-        while retry_count < max_retries:
+        while retry_count < self.max_retries:
             try:
-                # Open new tab and switch to it
-                self.driver.execute_script("window.open('');")
-                self.driver.switch_to.window(self.driver.window_handles[-1])
+                if self.detail_tab:
+                    # Open new tab and switch to it
+                    self.driver.execute_script("window.open('');")
+                    self.driver.switch_to.window(self.driver.window_handles[-1])
                 
                 print(f"\nProcessing URL: {url}")
-                self.driver.get(url)
-                
-                # Wait for the page to load completely
-                self.wait.until(
-                    EC.presence_of_element_located((By.TAG_NAME, "body"))
-                )
-                time.sleep(5)  # Additional wait for dynamic content
+                started = time.monotonic()
 
-                # Try different selectors to ensure the page is loaded
+                # Wait until any of the fields we extract has rendered
                 try:
-                    # Wait for any of these elements to be present
-                    selectors = [
-                        'ul[aria-label="Property details"]',
-                        'div._948d9e0a',  # Common class in property details
-                        'h1.fcca24e0',    # Property title
-                        'div[role="main"]' # Main content area
-                    ]
-                    
-                    for selector in selectors:
-                        try:
-                            element = self.wait.until(
+                    with self.rate_controller.slot():
+                        with crawler_stage('page_load', 'detail'):
+                            self.driver.get(url)
+                        with crawler_stage('wait', 'detail'):
+                            self.wait.until(EC.any_of(*(
                                 EC.presence_of_element_located((By.CSS_SELECTOR, selector))
-                            )
-                            if element:
-                                print(f"Found element with selector: {selector}")
-                                break
-                        except:
-                            continue
-
+                                for selector in DETAIL_READY_SELECTORS
+                            )))
                 except TimeoutException:
                     print("Timeout waiting for page elements")
                     retry_count += 1
+                    time.sleep(self.rate_controller.backoff(retry_count))
                     continue
 
-                # Extract property details
-                details = {}
-                
-                # Get basic information
-                try:
-                    details['title'] = self._safe_get_text(
-                        self.driver.find_element(By.CSS_SELECTOR, 'h1.fcca24e0')
-                    )
-                    print(f"Title: {details.get('title')}")
-                except:
-                    print("Could not find title")
-
-                # Get price information
-                try:
-                    price_element = self.driver.find_element(
-                        By.CSS_SELECTOR, 'span[aria-label="Price"], span.fcca24e0'
-                    )
-                    details['price'] = price_element.text
-                    print(f"Price: {details.get('price')}")
-                except:
-                    print("Could not find price")
-
-                # Update property data with what we found
-                property_data.update(details)
-
-                # Extract other information
-                self._extract_additional_details(property_data)
+                # Extract every field in one round trip
+                with crawler_stage('extract', 'detail'):
+                    snapshot = self._extract_additional_details(property_data)
+                if self.page_stats is not None:
+                    self.page_stats.record(self.driver, url, 'detail', started)
+                if self.archive is not None:
+                    self.archive.append('detail', url, snapshot or self.driver.page_source,
+                                        property_id=property_data['property_id'],
+                                        meta={'property_data': card_data})
                 
                 print("\nFinal Property Data:")
                 print(json.dumps(property_data, indent=2))
                 
                 # Queue the data for processing
-                process_property_details.delay(property_data)
+                with crawler_stage('enqueue', 'detail'):
+                    if self.batcher is not None:
+                        self.batcher.add(property_data)
+                    else:
+                        process_property_details.delay(property_data)
                 print(f"Queued property {property_data['property_id']}")
                 
-                break  # Success, exit retry loop
+                return True
 
             except WebDriverException as e:
                 print(f"Error processing property: {str(e)}")
                 retry_count += 1
-                time.sleep(2)
+                time.sleep(self.rate_controller.backoff(retry_count))
                 
             finally:
-                try:
-                    self.driver.close()
-                    self.driver.switch_to.window(self.driver.window_handles[0])
-                except:
-                    pass
+                if self.detail_tab:
+                    try:
+                        self.driver.close()
+                        self.driver.switch_to.window(self.driver.window_handles[0])
+                    except:
+                        pass
 
-        if retry_count == max_retries:
-            print(f"Failed to process property after {max_retries} attempts")
+        print(f"Failed to process property after {self.max_retries} attempts")
+        return False
 
     def _wait_and_get_element(self, selector, timeout=10, by=By.CSS_SELECTOR):
         """Wait for element and return it when available."""
@@ -226,83 +564,6 @@ class BayutSeleniumScraper:
         except:
             return None
 
-    def _extract_property_details(self):
-        """Extract all property details with proper error handling."""
-        details = {}
-        try:
-            # Extract all labeled fields
-            labeled_fields = [
-                'Price', 'Beds', 'Baths', 'Area', 'Type', 'Purpose', 'Property reference',
-                'Completion status', 'Reactivated date', 'Handover date', 'Permit Number',
-                'BRN number', 'Currency'
-            ]
-
-            for label in labeled_fields:
-                try:
-                    value = self._safe_get_text(
-                        self.driver.find_element(By.CSS_SELECTOR, f'*[aria-label="{label}"]')
-                    )
-                    if value:
-                        field = label.lower().replace(' ', '_')
-                        details[field] = value
-                        print(f"Found {label}: {value}")
-                except:
-                    pass
-
-            # Extract link information
-            try:
-                links = self.driver.find_elements(By.CSS_SELECTOR, 'a[aria-label]')
-                for link in links:
-                    name = link.get_attribute('aria-label')
-                    if name:
-                        details['link_name'] = name
-                        print(f"Found Link name: {name}")
-            except:
-                pass
-
-            # Extract guide link title
-            try:
-                guide_title = self.driver.find_element(
-                    By.CSS_SELECTOR, 'div[aria-label="Guide link title"]'
-                ).text
-                if guide_title:
-                    details['guide_link_title'] = guide_title
-                    print(f"Found Guide link title: {guide_title}")
-            except:
-                pass
-
-            return details
-
-        except Exception as e:
-            print(f"Error extracting property details: {str(e)}")
-            return {}
-
-    def _extract_contact_info(self):
-        """Extract contact information."""
-        contact_info = {}
-        try:
-            dialog = self.driver.find_element(By.CSS_SELECTOR, 'div[aria-label="Dialog"]')
-            contact_info['contact_number'] = dialog.find_element(By.CSS_SELECTOR, 'span[dir="ltr"]').text
-            contact_info['contact_reference'] = dialog.find_element(By.CSS_SELECTOR, 'div._460a308e').text
-        except:
-            pass
-        return contact_info
-
-    def _extract_agency_info(self):
-        """Extract agency information."""
-        agency_info = {}
-        try:
-            agency_section = self.driver.find_element(By.CSS_SELECTOR, 'div[aria-label="Agency info"]')
-            agency_info.update({
-                'agent_name': self._safe_get_text(agency_section.find_element(By.CSS_SELECTOR, 'h2')),
-                'agency_name': self._safe_get_text(agency_section.find_element(By.CSS_SELECTOR, 'h3[aria-label="Agency name"]')),
-                'agent_rating': self._safe_get_text(agency_section.find_element(By.CSS_SELECTOR, 'span')),
-                'agency_url': agency_section.find_element(By.CSS_SELECTOR, 'a[aria-label="View all properties"]').get_attribute('href')
-            })
-        except:
-            pass
-        return agency_info
-
     def _set_default_values(self, property_data):
         """Set default values for missing fields."""
         defaults = {
@@ -329,100 +590,97 @@ class BayutSeleniumScraper:
             if not property_data.get(field):
                 property_data[field] = default
 
-    def _extract_features(self, property_data):
-        """Extract features and amenities grouped by category."""
-        features = {}
-        try:
-            amenities_section = self.driver.find_element(By.CSS_SELECTOR, 'div._34032b68')
-            feature_elements = amenities_section.find_elements(By.CSS_SELECTOR, 'span._7181e5ac')
-            if feature_elements:
-                features['General'] = [element.text for element in feature_elements]
-                print(f"Found {len(features['General'])} direct amenities")
+    def _open_amenities_dialog(self):
+        """Open the "More amenities" dialog and read its grouped amenities.
 
-            try:
-                more_amenities = self.driver.find_element(By.CSS_SELECTOR, 'div[aria-label="More amenities"]')
-                if more_amenities.is_displayed() and more_amenities.is_enabled():
-                    more_amenities.click()
-                    time.sleep(1)
-
-                    categories = self.driver.find_elements(By.CSS_SELECTOR, 'div.da8f482a')
-                    for category in categories:
-                        try:
-                            category_name = category.find_element(By.CSS_SELECTOR, 'div._1c78af3b').text
-                            feature_elements = category.find_elements(By.CSS_SELECTOR, 'span._7181e5ac')
-                            features[category_name] = [element.text for element in feature_elements]
-                        except:
-                            continue
-
-                    close_button = self.driver.find_element(By.CSS_SELECTOR, 'button[aria-label="Close button"]')
-                    close_button.click()
-                else:
-                    print("More amenities button not interactable")
-
-            except Exception as e:
-                print(f"Could not open amenities dialog: {str(e)}")
-
-                if 'description' in property_data:
-                    desc = property_data['description']
-                    features_section = desc.split('Features & Amenities:')
-                    if len(features_section) > 1:
-                        feature_lines = [line.strip('➤ ').strip() 
-                                      for line in features_section[1].split('\n') 
-                                      if line.strip()]
-                        if feature_lines:
-                            features['From Description'] = feature_lines
-
-            return features
-
-        except Exception as e:
-            print(f"Error extracting features: {str(e)}")
-            return {}
-
-    def _extract_additional_details(self, property_data):
-        """Extract additional property details with better error handling."""
+        Returns ``(amenity_groups, html)``; with an archive, ``html`` is the
+        page source taken while the dialog is open, so replay sees it too.
+        """
         try:
-            # Extract features/amenities
-            features = self._extract_features(property_data)
-            if features:
-                property_data['features'] = features
-                print(f"Found {sum(len(v) for v in features.values())} features in {len(features)} categories")
-
-            # Extract description
-            try:
-                description_element = self.driver.find_element(
-                    By.CSS_SELECTOR, 
-                    'div[aria-label="Property description"] span._3547dac9'
-                )
-                if description_element:
-                    property_data['description'] = description_element.text
-                    print(f"Found description: {property_data['description'][:100]}...")
-            except Exception as e:
-                print(f"Error extracting description: {str(e)}")
-                property_data['description'] = None
-
-            # Extract all spans with aria-labels
-            elements = self.driver.find_elements(
-                By.CSS_SELECTOR, 
-                'span[aria-label], div[aria-label="Property details"] span'
+            self.driver.execute_script(
+                'document.querySelector(arguments[0]).click();',
+                DETAIL_SPEC['exists']['more_amenities']
             )
-            
-            for element in elements:
-                try:
-                    label = element.get_attribute('aria-label')
-                    if label:
-                        value = element.text
-                        if value:
-                            property_data[label.lower().replace(' ', '_')] = value
-                            print(f"Found {label}: {value}")
-                except:
-                    continue
+            self._wait_and_get_element(AMENITY_DIALOG_SPEC['groups']['amenity_groups']['selector'], timeout=5)
+            result = self.driver.execute_script(EXTRACT_SCRIPT, AMENITY_DIALOG_SPEC)
+            html = self.driver.page_source if self.archive is not None else None
+            self.driver.execute_script(
+                'const button = document.querySelector(\'button[aria-label="Close button"]\');'
+                'if (button) button.click();'
+            )
+            return result['groups'].get('amenity_groups') or {}, html
+        except WebDriverException as e:
+            print(f"Could not open amenities dialog: {str(e)}")
+            return {}, None
 
-        except Exception as e:
+    def _extract_additional_details(self, property_data):
+        """Extract all detail page fields with a single in-browser script.
+
+        Returns the page source taken with the amenities dialog open, if it
+        was opened for the archive, else None.
+        """
+        html = None
+        try:
+            result = self.driver.execute_script(EXTRACT_SCRIPT, DETAIL_SPEC)
+            if result['exists'].get('more_amenities'):
+                result['groups']['amenity_groups'], html = self._open_amenities_dialog()
+            apply_detail_result(result, property_data)
+            print(f"Found {len(result['fields'])} fields and {len(result['labelled'])} labelled values")
+        except WebDriverException as e:
             print(f"Error extracting additional details: {str(e)}")
+        return html
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scrape Bayut property listings")
+    parser.add_argument('--base-url', default=DEFAULT_BASE_URL, help="First listing page to crawl")
+    parser.add_argument('--listing-mode', choices=['browser', 'http'], default='browser',
+                        help="Fetch listing pages with Selenium or with the plain HTTP client")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Number of browsers scraping detail pages in parallel")
+    parser.add_argument('--pages-per-driver', type=int, default=50,
+                        help="Restart a worker's browser after this many detail pages")
+    parser.add_argument('--max-in-flight', type=int, default=16,
+                        help="Upper bound for the adaptive number of concurrent fetches")
+    parser.add_argument('--max-retries', type=int, default=3,
+                        help="Attempts per page before it is recorded as failed")
+    parser.add_argument('--batch-size', type=int, default=100,
+                        help="Send scraped properties to the processor in batches of this size")
+    parser.add_argument('--batch-delay', type=float, default=5.0,
+                        help="Send a partial batch after its oldest property has waited this many seconds")
+    parser.add_argument('--profile', choices=PROFILES, default='default',
+                        help="Browser profile; 'lean' is headless and blocks images, fonts, media and trackers")
+    parser.add_argument('--page-stats', action='store_true',
+                        help="Report bytes transferred and load time per page")
+    parser.add_argument('--archive-dir',
+                        help="Save compressed listing/detail HTML here for offline replay")
+    parser.add_argument('--checkpoint', default='crawl_checkpoint.json',
+                        help="File recording the page cursor and in-flight/failed detail pages")
+    parser.add_argument('--resume', action='store_true',
+                        help="Continue from the checkpoint and retry its failed detail pages")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Skip listings already in the database")
+    parser.add_argument('--stop-after-known-pages', type=int, default=3,
+                        help="In incremental mode, stop after this many pages of known listings")
+    args = parser.parse_args()
+
+    start_exporter('crawler')
     try:
-        scraper = BayutSeleniumScraper()
+        scraper = BayutSeleniumScraper(
+            base_url=args.base_url,
+            listing_mode=args.listing_mode,
+            workers=args.workers,
+            pages_per_driver=args.pages_per_driver,
+            incremental=args.incremental,
+            stop_after_known_pages=args.stop_after_known_pages,
+            profile=args.profile,
+            page_stats=PageStats() if args.page_stats else None,
+            archive=PageArchive(args.archive_dir) if args.archive_dir else None,
+            checkpoint=CrawlCheckpoint.load(args.checkpoint),
+            resume=args.resume,
+            rate_controller=AdaptiveRateController(initial=max(1, args.workers), max_limit=args.max_in_flight),
+            max_retries=args.max_retries,
+            batcher=PropertyBatcher(max_size=args.batch_size, max_delay=args.batch_delay),
+        )
         scraper.scrape()
     except KeyboardInterrupt:
         print("\nScraping interrupted by user")
@@ -0,0 +1,107 @@
+import threading
+import time
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from src.metrics import instrument_webdriver
+
+BROWSER_BINARY = r"C:\Program Files\BraveSoftware\Brave-Browser\Application\brave.exe"
+
+PROFILES = ('default', 'lean')
+
+# Requests the lean profile blocks through DevTools: heavy assets we never
+# read, plus analytics and ad domains.
+BLOCKED_URL_PATTERNS = [
+    '*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.avif', '*.svg', '*.ico',
+    '*.mp4', '*.webm', '*.mp3', '*.m3u8',
+    '*.woff', '*.woff2', '*.ttf', '*.otf', '*.eot',
+    '*googletagmanager.com*', '*google-analytics.com*', '*doubleclick.net*',
+    '*googlesyndication.com*', '*googleadservices.com*', '*adservice.google.*',
+    '*facebook.net*', '*facebook.com/tr*', '*connect.facebook.*',
+    '*hotjar.com*', '*clarity.ms*', '*criteo.*', '*tiktok.com*', '*snapchat.com*',
+    '*bing.com*', '*taboola.com*', '*outbrain.com*', '*moengage.com*',
+]
+
+PAGE_STATS_SCRIPT = """
+const entries = performance.getEntriesByType('navigation').concat(performance.getEntriesByType('resource'));
+const stats = {bytes: entries.reduce((total, entry) => total + (entry.transferSize || 0), 0), requests: entries.length};
+performance.clearResourceTimings();
+return stats;
+"""
+
+
+def create_driver(profile='default'):
+    """Start a Chromium-based WebDriver with the crawler's browser options.
+
+    The ``lean`` profile runs headless with an eager page-load strategy and
+    blocks images, media, fonts and third-party trackers.
+    """
+    options = Options()
+    options.binary_location = BROWSER_BINARY
+    options.add_argument('--no-sandbox')
+    options.add_argument('--disable-dev-shm-usage')
+    options.add_argument('--disable-gpu')
+    options.add_argument('--window-size=1920,1080')
+    options.add_experimental_option('excludeSwitches', ['enable-logging'])
+
+    if profile == 'lean':
+        options.add_argument('--headless=new')
+        options.add_argument('--blink-settings=imagesEnabled=false')
+        options.add_argument('--disable-extensions')
+        options.add_argument('--mute-audio')
+        options.page_load_strategy = 'eager'
+        options.add_experimental_option('prefs', {
+            'profile.managed_default_content_settings.images': 2,
+            'profile.default_content_setting_values.notifications': 2,
+        })
+
+    driver = instrument_webdriver(webdriver.Chrome(options=options))
+
+    if profile == 'lean':
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': BLOCKED_URL_PATTERNS})
+    return driver
+
+
+class PageStats:
+    """Collects transferred bytes and load time per page, shared across browser workers.
+
+    Byte counts come from the Resource Timing API; cross-origin responses
+    without ``Timing-Allow-Origin`` report zero, so totals are a lower bound.
+    """
+
+    def __init__(self):
+        self.pages = []
+        self._lock = threading.Lock()
+
+    def record(self, driver, url, kind, started):
+        seconds = time.monotonic() - started
+        try:
+            transfer = driver.execute_script(PAGE_STATS_SCRIPT)
+        except Exception:
+            transfer = {'bytes': 0, 'requests': 0}
+        with self._lock:
+            self.pages.append({
+                'url': url,
+                'kind': kind,
+                'seconds': seconds,
+                'bytes': transfer['bytes'],
+                'requests': transfer['requests'],
+            })
+
+    def report(self):
+        """Summarise pages, bytes and seconds per page kind."""
+        with self._lock:
+            pages = list(self.pages)
+        summary = {}
+        for kind in sorted({page['kind'] for page in pages}):
+            kind_pages = [page for page in pages if page['kind'] == kind]
+            total_bytes = sum(page['bytes'] for page in kind_pages)
+            total_seconds = sum(page['seconds'] for page in kind_pages)
+            summary[kind] = {
+                'pages': len(kind_pages),
+                'total_bytes': total_bytes,
+                'avg_bytes': total_bytes / len(kind_pages),
+                'avg_seconds': total_seconds / len(kind_pages),
+                'avg_requests': sum(page['requests'] for page in kind_pages) / len(kind_pages),
+            }
+        return summary
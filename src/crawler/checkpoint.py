@@ -0,0 +1,107 @@
+import json
+import os
+import threading
+from datetime import datetime
+
+
+class CrawlCheckpoint:
+    """Durable record of crawl progress, used by ``--resume``.
+
+    Tracks the listing page cursor (number and URL of the last page whose
+    listings were handed out), detail URLs that are in flight or failed (with
+    their card data, so they can be retried without the listing page) and the
+    last listing seen. Every change is written atomically via a temp file and
+    ``os.replace``, so a killed process always leaves a readable checkpoint.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.page_number = 0
+        self.page_url = None
+        self.last_seen = None
+        self.in_flight = {}
+        self.failed = {}
+        self.completed = False
+        self.updated_at = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path):
+        """Read an existing checkpoint, or start an empty one if there is none."""
+        checkpoint = cls(path)
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as checkpoint_file:
+                state = json.load(checkpoint_file)
+            checkpoint.page_number = state.get('page_number', 0)
+            checkpoint.page_url = state.get('page_url')
+            checkpoint.last_seen = state.get('last_seen')
+            checkpoint.in_flight = state.get('in_flight', {})
+            checkpoint.failed = state.get('failed', {})
+            checkpoint.completed = state.get('completed', False)
+            checkpoint.updated_at = state.get('updated_at')
+        return checkpoint
+
+    def _save(self):
+        self.updated_at = datetime.now().isoformat()
+        state = {
+            'page_number': self.page_number,
+            'page_url': self.page_url,
+            'last_seen': self.last_seen,
+            'in_flight': self.in_flight,
+            'failed': self.failed,
+            'completed': self.completed,
+            'updated_at': self.updated_at,
+        }
+        temp_path = f'{self.path}.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as checkpoint_file:
+            json.dump(state, checkpoint_file)
+            checkpoint_file.flush()
+            os.fsync(checkpoint_file.fileno())
+        os.replace(temp_path, self.path)
+
+    def pending(self):
+        """Detail pages to retry on resume: everything failed or still in flight."""
+        with self._lock:
+            pending = dict(self.failed)
+            pending.update(self.in_flight)
+        return list(pending.items())
+
+    def page_started(self, page_number, page_url, listings):
+        """Advance the cursor and mark the page's listings as in flight in one write."""
+        with self._lock:
+            self.page_number = page_number
+            self.page_url = page_url
+            for property_data, detail_url in listings:
+                self.in_flight[detail_url] = dict(property_data)
+                self.last_seen = property_data['property_id']
+            self._save()
+
+    def detail_started(self, detail_url, property_data):
+        with self._lock:
+            self.in_flight[detail_url] = dict(property_data)
+            self._save()
+
+    def detail_finished(self, detail_url, property_data, success):
+        with self._lock:
+            card_data = self.in_flight.pop(detail_url, None) or dict(property_data)
+            if success:
+                self.failed.pop(detail_url, None)
+            else:
+                self.failed[detail_url] = card_data
+            self._save()
+
+    def mark_completed(self):
+        with self._lock:
+            self.completed = True
+            self._save()
+
+    def reset(self):
+        """Forget previous progress when a crawl starts from scratch."""
+        with self._lock:
+            self.page_number = 0
+            self.page_url = None
+            self.last_seen = None
+            self.in_flight = {}
+            self.failed = {}
+            self.completed = False
+            self._save()
@@ -0,0 +1,198 @@
+"""Declarative detail-page extraction.
+
+Everything we read from a detail page is described by a selector spec. The
+spec is handed to :data:`EXTRACT_SCRIPT`, which runs inside the browser and
+returns all values as one JSON object, so a page costs a single WebDriver
+round trip instead of one per element. :func:`extract_from_html` evaluates
+the same spec against archived HTML with lxml for offline replays.
+
+Spec keys:
+
+- ``fields``: ``name -> {'selector', 'attribute'?, 'last'?}``; text (or the
+  attribute) of the first (or last) match.
+- ``labelled``: selectors whose matches each contribute ``aria-label -> text``.
+- ``lists``: ``name -> selector``; text of every match.
+- ``groups``: ``name -> {'selector', 'name', 'items'}``; ``{group name: [item texts]}``
+  for every container match.
+- ``exists``: ``name -> selector``; whether anything matches.
+"""
+from urllib.parse import urljoin
+import lxml.html
+
+DETAIL_SPEC = {
+    'fields': {
+        'title': {'selector': 'h1.fcca24e0'},
+        'price': {'selector': 'span[aria-label="Price"], span.fcca24e0'},
+        'description': {'selector': 'div[aria-label="Property description"] span._3547dac9'},
+        'link_name': {'selector': 'a[aria-label]', 'attribute': 'aria-label', 'last': True},
+        'guide_link_title': {'selector': 'div[aria-label="Guide link title"]'},
+        'agent_name': {'selector': 'div[aria-label="Agency info"] h2'},
+        'agency_name': {'selector': 'div[aria-label="Agency info"] h3[aria-label="Agency name"]'},
+        'agent_rating': {'selector': 'div[aria-label="Agency info"] span'},
+        'agency_url': {
+            'selector': 'div[aria-label="Agency info"] a[aria-label="View all properties"]',
+            'attribute': 'href',
+        },
+        'contact_number': {'selector': 'div[aria-label="Dialog"] span[dir="ltr"]'},
+        'contact_reference': {'selector': 'div[aria-label="Dialog"] div._460a308e'},
+    },
+    'labelled': ['span[aria-label]', 'div[aria-label="Property details"] span'],
+    'lists': {
+        'amenities': 'div._34032b68 span._7181e5ac',
+    },
+    'groups': {},
+    'exists': {
+        'more_amenities': 'div[aria-label="More amenities"]',
+    },
+}
+
+# A detail page is ready for extraction once any of these has rendered.
+DETAIL_READY_SELECTORS = [
+    DETAIL_SPEC['fields']['title']['selector'],
+    DETAIL_SPEC['fields']['price']['selector'],
+    'ul[aria-label="Property details"]',
+    'div[aria-label="Property details"] span',
+]
+
+# Read once the "More amenities" dialog is open.
+AMENITY_DIALOG_SPEC = {
+    'fields': {},
+    'labelled': [],
+    'lists': {},
+    'groups': {
+        'amenity_groups': {'selector': 'div.da8f482a', 'name': 'div._1c78af3b', 'items': 'span._7181e5ac'},
+    },
+    'exists': {},
+}
+
+EXTRACT_SCRIPT = """
+const spec = arguments[0];
+const text = (el) => (el.innerText || el.textContent || '').trim();
+const read = (el, attribute) => {
+    if (!attribute) return text(el);
+    const property = el[attribute];
+    return typeof property === 'string' ? property : el.getAttribute(attribute);
+};
+const result = {fields: {}, labelled: {}, lists: {}, groups: {}, exists: {}};
+
+for (const [name, field] of Object.entries(spec.fields || {})) {
+    const matches = document.querySelectorAll(field.selector);
+    if (!matches.length) continue;
+    const el = field.last ? matches[matches.length - 1] : matches[0];
+    result.fields[name] = read(el, field.attribute);
+}
+for (const selector of spec.labelled || []) {
+    for (const el of document.querySelectorAll(selector)) {
+        const label = el.getAttribute('aria-label');
+        const value = label && text(el);
+        if (value) result.labelled[label] = value;
+    }
+}
+for (const [name, selector] of Object.entries(spec.lists || {})) {
+    result.lists[name] = Array.from(document.querySelectorAll(selector), text);
+}
+for (const [name, group] of Object.entries(spec.groups || {})) {
+    const groups = {};
+    for (const container of document.querySelectorAll(group.selector)) {
+        const heading = container.querySelector(group.name);
+        if (!heading) continue;
+        groups[text(heading)] = Array.from(container.querySelectorAll(group.items), text);
+    }
+    result.groups[name] = groups;
+}
+for (const [name, selector] of Object.entries(spec.exists || {})) {
+    result.exists[name] = document.querySelector(selector) !== null;
+}
+return result;
+"""
+
+
+def _text(element):
+    return element.text_content().strip()
+
+
+def _read(element, attribute, base_url):
+    if not attribute:
+        return _text(element)
+    value = element.get(attribute)
+    if attribute == 'href' and value is not None:
+        return urljoin(base_url, value)
+    return value
+
+
+def extract_from_html(html, spec, base_url=''):
+    """Evaluate an extraction spec against raw HTML, mirroring :data:`EXTRACT_SCRIPT`."""
+    doc = lxml.html.fromstring(html)
+    result = {'fields': {}, 'labelled': {}, 'lists': {}, 'groups': {}, 'exists': {}}
+
+    for name, field in spec.get('fields', {}).items():
+        matches = doc.cssselect(field['selector'])
+        if not matches:
+            continue
+        element = matches[-1] if field.get('last') else matches[0]
+        result['fields'][name] = _read(element, field.get('attribute'), base_url)
+
+    for selector in spec.get('labelled', []):
+        for element in doc.cssselect(selector):
+            label = element.get('aria-label')
+            value = label and _text(element)
+            if value:
+                result['labelled'][label] = value
+
+    for name, selector in spec.get('lists', {}).items():
+        result['lists'][name] = [_text(element) for element in doc.cssselect(selector)]
+
+    for name, group in spec.get('groups', {}).items():
+        groups = {}
+        for container in doc.cssselect(group['selector']):
+            headings = container.cssselect(group['name'])
+            if not headings:
+                continue
+            groups[_text(headings[0])] = [_text(element) for element in container.cssselect(group['items'])]
+        result['groups'][name] = groups
+
+    for name, selector in spec.get('exists', {}).items():
+        result['exists'][name] = bool(doc.cssselect(selector))
+
+    return result
+
+
+def labelled_key(label):
+    """Turn an aria-label such as ``Property reference`` into ``property_reference``."""
+    return label.lower().replace(' ', '_')
+
+
+def features_from_description(description):
+    """Fall back to the bullet list under "Features & Amenities:" in the description."""
+    if not description:
+        return []
+    features_section = description.split('Features & Amenities:')
+    if len(features_section) < 2:
+        return []
+    return [line.strip('➤ ').strip() for line in features_section[1].split('\n') if line.strip()]
+
+
+def apply_detail_result(result, property_data):
+    """Map an extraction result onto ``property_data`` using the model's field names."""
+    for name, value in result.get('fields', {}).items():
+        if value:
+            property_data[name] = value
+    property_data.setdefault('description', None)
+
+    features = {}
+    amenities = result.get('lists', {}).get('amenities')
+    if amenities:
+        features['General'] = amenities
+    features.update(result.get('groups', {}).get('amenity_groups') or {})
+    if len(features) <= 1 and result.get('exists', {}).get('more_amenities'):
+        # The dialog could not be read; keep what the description lists
+        description_features = features_from_description(property_data.get('description'))
+        if description_features:
+            features['From Description'] = description_features
+    if features:
+        property_data['features'] = features
+
+    for label, value in result.get('labelled', {}).items():
+        property_data[labelled_key(label)] = value
+
+    return property_data
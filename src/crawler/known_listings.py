@@ -0,0 +1,56 @@
+from array import array
+from bisect import bisect_left
+from sqlalchemy import create_engine, select
+from src.api.config import settings
+from src.models.property import Property
+
+
+class KnownListingIndex:
+    """Compact membership index of property IDs already stored in ``properties``.
+
+    Bayut IDs are numeric, so they are kept in a sorted ``array('q')`` (8 bytes
+    per ID, binary-searched). Non-numeric IDs and IDs seen during the current
+    run go into small side sets.
+    """
+
+    def __init__(self, property_ids=()):
+        numeric = []
+        self._other = set()
+        for property_id in property_ids:
+            property_id = str(property_id)
+            if property_id.isdigit():
+                numeric.append(int(property_id))
+            else:
+                self._other.add(property_id)
+        numeric.sort()
+        self._ids = array('q', numeric)
+        self._added = set()
+
+    @classmethod
+    def from_database(cls, database_url=None, chunk_size=50000):
+        """Stream every stored ``property_id`` into a new index."""
+        engine = create_engine(database_url or settings.database_url)
+        try:
+            with engine.connect() as connection:
+                result = connection.execution_options(stream_results=True, yield_per=chunk_size).execute(
+                    select(Property.property_id)
+                )
+                return cls(row[0] for row in result)
+        finally:
+            engine.dispose()
+
+    def __contains__(self, property_id):
+        property_id = str(property_id)
+        if property_id in self._added or property_id in self._other:
+            return True
+        if not property_id.isdigit():
+            return False
+        value = int(property_id)
+        position = bisect_left(self._ids, value)
+        return position < len(self._ids) and self._ids[position] == value
+
+    def __len__(self):
+        return len(self._ids) + len(self._other) + len(self._added)
+
+    def add(self, property_id):
+        self._added.add(str(property_id))
@@ -0,0 +1,103 @@
+import logging
+import queue
+import threading
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class DetailWorkerPool:
+    """Pool of browser workers that scrape detail pages from a shared queue.
+
+    Each worker thread owns one scraper (and therefore one browser) created by
+    ``scraper_factory``. The listing walker feeds ``(detail_url, property_data)``
+    items through :meth:`submit`; the bounded queue applies backpressure so the
+    walker never runs far ahead of the browsers. Drivers are recycled after
+    ``pages_per_driver`` pages and replaced when they stop responding.
+    ``on_done(detail_url, property_data, success)`` is called after each page.
+    """
+
+    def __init__(self, scraper_factory, workers=4, pages_per_driver=50, queue_size=None, on_done=None):
+        self.scraper_factory = scraper_factory
+        self.on_done = on_done
+        self.workers = workers
+        self.pages_per_driver = pages_per_driver
+        self.queue = queue.Queue(maxsize=queue_size or workers * 4)
+        self.processed = 0
+        self.failed = 0
+        self._lock = threading.Lock()
+        self._threads = []
+
+    def start(self):
+        for worker_id in range(self.workers):
+            thread = threading.Thread(
+                target=self._run, args=(worker_id,), name=f"detail-worker-{worker_id}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def submit(self, detail_url, property_data):
+        """Queue a detail page, blocking while all workers are busy and the queue is full."""
+        self.queue.put((detail_url, property_data))
+
+    def close(self, cancel=False):
+        """Stop the workers once the queue is drained (or dropped when ``cancel`` is set)."""
+        if cancel:
+            try:
+                while True:
+                    self.queue.get_nowait()
+                    self.queue.task_done()
+            except queue.Empty:
+                pass
+        for _ in self._threads:
+            self.queue.put(_STOP)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+        logger.info(f"Detail pool finished: {self.processed} processed, {self.failed} failed")
+
+    def _record(self, success):
+        with self._lock:
+            if success:
+                self.processed += 1
+            else:
+                self.failed += 1
+
+    def _run(self, worker_id):
+        scraper = None
+        pages = 0
+        while True:
+            item = self.queue.get()
+            try:
+                if item is _STOP:
+                    break
+                detail_url, property_data = item
+
+                if scraper is None:
+                    scraper = self.scraper_factory()
+                    pages = 0
+
+                try:
+                    success = scraper._get_property_details(detail_url, property_data)
+                except Exception as e:
+                    logger.error(f"Worker {worker_id} failed on {detail_url}: {str(e)}")
+                    success = False
+                self._record(success)
+                if self.on_done is not None:
+                    self.on_done(detail_url, property_data, success)
+                pages += 1
+
+                if not success and not scraper.driver_alive():
+                    logger.warning(f"Worker {worker_id} browser crashed, replacing it")
+                    scraper.restart_driver()
+                    pages = 0
+                elif pages >= self.pages_per_driver:
+                    logger.info(f"Worker {worker_id} recycling browser after {pages} pages")
+                    scraper.restart_driver()
+                    pages = 0
+            finally:
+                self.queue.task_done()
+
+        if scraper is not None:
+            scraper.restart_driver()
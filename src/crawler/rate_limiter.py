@@ -0,0 +1,139 @@
+from contextlib import asynccontextmanager, contextmanager
+import asyncio
+import random
+import threading
+import time
+import httpx
+from selenium.common.exceptions import TimeoutException, WebDriverException
+
+SUCCESS = 'success'
+THROTTLED = 'throttled'
+TIMEOUT = 'timeout'
+ERROR = 'error'
+
+THROTTLE_STATUS_CODES = {429, 503}
+
+
+class RateLimited(Exception):
+    """Raised by a fetch path when the site answers with a throttling status."""
+
+    def __init__(self, status_code, retry_after=None):
+        super().__init__(f"Throttled with HTTP {status_code}")
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+def classify_exception(exc):
+    """Map a fetch failure to a congestion signal, or ``None`` if it says nothing about load."""
+    if isinstance(exc, RateLimited):
+        return THROTTLED
+    if isinstance(exc, httpx.HTTPStatusError):
+        status_code = exc.response.status_code
+        if status_code in THROTTLE_STATUS_CODES:
+            return THROTTLED
+        # A failing server is a load signal too; other 4xx are about the request
+        return ERROR if status_code >= 500 else None
+    if isinstance(exc, (TimeoutException, httpx.TimeoutException)):
+        return TIMEOUT
+    if isinstance(exc, (WebDriverException, httpx.TransportError)):
+        return ERROR
+    return None
+
+
+class AdaptiveRateController:
+    """Shared AIMD fetch scheduler for the Selenium and HTTP fetch paths.
+
+    ``limit`` is the number of fetches allowed in flight. Each success adds
+    ``increase / limit`` (about +1 per round of ``limit`` fetches); a timeout,
+    throttling response or WebDriver error multiplies it by ``decrease`` and
+    pauses new fetches for a jittered exponential backoff. Successes slower
+    than ``target_latency`` hold the limit instead of growing it.
+    """
+
+    def __init__(self, initial=4, min_limit=1, max_limit=16, increase=1.0, decrease=0.5,
+                 target_latency=None, base_delay=1.0, max_delay=60.0):
+        self.limit = float(initial)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.increase = increase
+        self.decrease = decrease
+        self.target_latency = target_latency
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.in_flight = 0
+        self.consecutive_failures = 0
+        self._pause_until = 0.0
+        self._condition = threading.Condition()
+
+    def backoff(self, attempt):
+        """Full-jitter exponential backoff delay for the given attempt number."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def _try_acquire(self):
+        """Take a slot and return 0, or return how long to wait before trying again."""
+        now = time.monotonic()
+        if now < self._pause_until:
+            return self._pause_until - now
+        if self.in_flight < int(self.limit):
+            self.in_flight += 1
+            return 0
+        return None
+
+    def acquire(self):
+        with self._condition:
+            while True:
+                wait = self._try_acquire()
+                if wait == 0:
+                    return
+                self._condition.wait(timeout=wait)
+
+    async def acquire_async(self):
+        while True:
+            with self._condition:
+                wait = self._try_acquire()
+            if wait == 0:
+                return
+            await asyncio.sleep(min(wait, 0.5) if wait is not None else 0.05)
+
+    def release(self, outcome, latency=None, retry_after=None):
+        with self._condition:
+            self.in_flight -= 1
+            if outcome == SUCCESS:
+                self.consecutive_failures = 0
+                if not (self.target_latency and latency and latency > self.target_latency):
+                    self.limit = min(self.max_limit, self.limit + self.increase / self.limit)
+            elif outcome is not None:
+                self.consecutive_failures += 1
+                self.limit = max(self.min_limit, self.limit * self.decrease)
+                delay = max(retry_after or 0, self.backoff(self.consecutive_failures))
+                self._pause_until = max(self._pause_until, time.monotonic() + delay)
+            self._condition.notify_all()
+
+    @contextmanager
+    def slot(self):
+        """Hold a fetch slot; the outcome is inferred from how the block exits."""
+        self.acquire()
+        started = time.monotonic()
+        try:
+            yield
+        except Exception as e:
+            self.release(classify_exception(e), retry_after=getattr(e, 'retry_after', None))
+            raise
+        except BaseException:
+            self.release(None)
+            raise
+        self.release(SUCCESS, latency=time.monotonic() - started)
+
+    @asynccontextmanager
+    async def async_slot(self):
+        await self.acquire_async()
+        started = time.monotonic()
+        try:
+            yield
+        except Exception as e:
+            self.release(classify_exception(e), retry_after=getattr(e, 'retry_after', None))
+            raise
+        except BaseException:
+            self.release(None)
+            raise
+        self.release(SUCCESS, latency=time.monotonic() - started)
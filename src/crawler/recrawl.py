@@ -0,0 +1,155 @@
+from datetime import datetime, timedelta
+import argparse
+import heapq
+import logging
+from sqlalchemy import create_engine, func, or_, select, update
+from src.api.config import settings
+from src.crawler.batcher import PropertyBatcher
+from src.crawler.bayut import BayutSeleniumScraper
+from src.crawler.browser import PROFILES
+from src.metrics import start_exporter
+from src.models.property import Property
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DETAIL_URL_TEMPLATE = 'https://www.bayut.com/property/details-{property_id}.html'
+
+# Listings whose detail page failed this many fetches in a row are no longer scheduled
+MAX_FAILED_CHECKS = 3
+
+
+def recrawl_priority(now, last_checked, created_at, price_change_count, failed_checks=0):
+    """Score how much a re-fetch of this listing is worth.
+
+    The expected number of changes since the last check is roughly
+    staleness x change rate, so the score multiplies the days since
+    ``last_checked`` by the observed price changes per day (plus a floor,
+    so stable listings still age into the queue). Young listings get a boost
+    because they are edited most often in their first weeks. Each failed
+    fetch since the last successful one halves the score.
+    """
+    last_checked = last_checked or created_at or now
+    created_at = created_at or last_checked
+    staleness_days = max((now - last_checked).total_seconds() / 86400, 0)
+    age_days = max((now - created_at).total_seconds() / 86400, 1)
+    change_rate = (price_change_count or 0) / age_days
+    youth = 1 / (1 + age_days / 30)
+    return staleness_days * (1 + 30 * change_rate) * (0.5 + youth) / 2 ** (failed_checks or 0)
+
+
+class RecrawlScraper(BayutSeleniumScraper):
+    """Detail scraper that remembers which listings could not be fetched."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.failed = []
+
+    def _detail_finished(self, detail_url, property_data, success):
+        super()._detail_finished(detail_url, property_data, success)
+        if not success:
+            # list.append is atomic, and pool workers report from their own threads
+            self.failed.append(property_data['property_id'])
+
+
+class RecrawlScheduler:
+    """Spends a fixed budget of detail fetches on the listings most likely to have changed.
+
+    Candidates are streamed from ``properties`` and kept in a bounded min-heap
+    of ``budget`` entries, so memory stays O(budget) however many listings
+    are stored. Failed fetches are recorded with :meth:`record_failures`, and
+    listings with ``max_failed_checks`` failures in a row are skipped.
+    """
+
+    def __init__(self, budget, min_staleness=timedelta(hours=12), max_failed_checks=MAX_FAILED_CHECKS,
+                 database_url=None):
+        self.budget = budget
+        self.min_staleness = min_staleness
+        self.max_failed_checks = max_failed_checks
+        self.database_url = database_url or settings.database_url
+
+    def select(self, now=None):
+        """Return ``(score, property_id)`` pairs for the highest-value listings, best first."""
+        now = now or datetime.now()
+        query = select(
+            Property.property_id,
+            Property.last_checked,
+            Property.created_at,
+            Property.price_change_count,
+            Property.failed_checks,
+        ).where(
+            or_(Property.last_checked < now - self.min_staleness, Property.last_checked.is_(None)),
+            func.coalesce(Property.failed_checks, 0) < self.max_failed_checks,
+        )
+
+        heap = []
+        engine = create_engine(self.database_url)
+        try:
+            with engine.connect() as connection:
+                result = connection.execution_options(stream_results=True, yield_per=10000).execute(query)
+                for property_id, last_checked, created_at, price_change_count, failed_checks in result:
+                    score = recrawl_priority(now, last_checked, created_at, price_change_count, failed_checks)
+                    entry = (score, property_id)
+                    if len(heap) < self.budget:
+                        heapq.heappush(heap, entry)
+                    elif entry > heap[0]:
+                        heapq.heapreplace(heap, entry)
+        finally:
+            engine.dispose()
+        return sorted(heap, reverse=True)
+
+    def record_failures(self, property_ids, now=None):
+        """Count a failed fetch against each listing and restart its staleness clock.
+
+        A successful ingest clears the count again (see ``upsert_properties``).
+        """
+        if not property_ids:
+            return
+        engine = create_engine(self.database_url)
+        try:
+            with engine.begin() as connection:
+                connection.execute(
+                    update(Property)
+                    .where(Property.property_id.in_(property_ids))
+                    .values(
+                        last_checked=now or datetime.now(),
+                        failed_checks=func.coalesce(Property.failed_checks, 0) + 1,
+                        updated_at=Property.updated_at,
+                    )
+                )
+        finally:
+            engine.dispose()
+
+    def details(self, now=None):
+        """The selected listings as ``(detail_url, property_data)`` pairs for the scraper."""
+        crawl_timestamp = datetime.now().isoformat()
+        return [
+            (DETAIL_URL_TEMPLATE.format(property_id=property_id),
+             {'property_id': property_id, 'crawl_timestamp': crawl_timestamp})
+            for _, property_id in self.select(now)
+        ]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Re-fetch the stored listings most likely to have changed")
+    parser.add_argument('--budget', type=int, default=500, help="Detail pages to fetch this run")
+    parser.add_argument('--min-staleness-hours', type=float, default=12,
+                        help="Skip listings checked more recently than this")
+    parser.add_argument('--max-failed-checks', type=int, default=MAX_FAILED_CHECKS,
+                        help="Skip listings whose detail page failed this many fetches in a row")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Number of browsers scraping detail pages in parallel")
+    parser.add_argument('--profile', choices=PROFILES, default='lean')
+    args = parser.parse_args()
+
+    start_exporter('recrawl')
+    scheduler = RecrawlScheduler(args.budget, min_staleness=timedelta(hours=args.min_staleness_hours),
+                                 max_failed_checks=args.max_failed_checks)
+    details = scheduler.details()
+    logger.info(f"Recrawling {len(details)} listings")
+    scraper = RecrawlScraper(workers=args.workers, profile=args.profile, batcher=PropertyBatcher())
+    try:
+        scraper.scrape_details(details)
+    finally:
+        scheduler.record_failures(scraper.failed)
+        logger.info(f"{len(scraper.failed)} of {len(details)} detail pages failed")
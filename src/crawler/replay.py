@@ -0,0 +1,101 @@
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import argparse
+import logging
+import os
+from src.crawler.archive import PageArchive, read_frames
+from src.crawler.batcher import PropertyBatcher
+from src.crawler.bayut import parse_listing_page
+from src.crawler.extraction import AMENITY_DIALOG_SPEC, DETAIL_SPEC, apply_detail_result, extract_from_html
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def extract_archived_page(header, html):
+    """Re-run extraction on an archived page and return the property dicts it yields.
+
+    They are stamped with the page's crawl time rather than the replay's.
+    """
+    if header['kind'] == 'listing':
+        listings, _ = parse_listing_page(html, header['url'])
+        extracted = [property_data for property_data, _ in listings]
+    else:
+        result = extract_from_html(html, DETAIL_SPEC, header['url'])
+        # Detail pages are archived while the amenities dialog is open
+        dialog = extract_from_html(html, AMENITY_DIALOG_SPEC, header['url'])
+        if dialog['groups'].get('amenity_groups'):
+            result['groups']['amenity_groups'] = dialog['groups']['amenity_groups']
+        property_data = dict(header['meta'].get('property_data') or {})
+        extracted = [apply_detail_result(result, property_data)]
+    for property_data in extracted:
+        property_data['crawl_timestamp'] = header['crawled_at']
+    return extracted
+
+
+def replay_segment(archive_path, segment, entries, dry_run=False):
+    """Replay one segment's pages into the processor; returns ``(pages, properties)``."""
+    pages = 0
+    properties = 0
+    batcher = None if dry_run else PropertyBatcher(max_size=500)
+    for header, html in read_frames(archive_path, segment, entries):
+        pages += 1
+        try:
+            extracted = extract_archived_page(header, html)
+        except Exception as e:
+            logger.error(f"Error re-parsing {header['url']}: {str(e)}")
+            continue
+        for property_data in extracted:
+            if not property_data.get('property_id'):
+                continue
+            if batcher is not None:
+                batcher.add(property_data)
+            properties += 1
+    if batcher is not None:
+        batcher.close()
+    return pages, properties
+
+
+def replay(archive_path, kind=None, property_ids=None, since=None, workers=None, dry_run=False):
+    """Re-run extraction over an archive in parallel, one segment per task."""
+    archive = PageArchive(archive_path)
+    by_segment = defaultdict(list)
+    for entry in archive.iter_index(kind=kind, property_ids=property_ids, since=since):
+        by_segment[entry['segment']].append(entry)
+
+    total_pages = 0
+    total_properties = 0
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+        futures = {
+            executor.submit(replay_segment, archive_path, segment, entries, dry_run): segment
+            for segment, entries in by_segment.items()
+        }
+        for future in as_completed(futures):
+            pages, properties = future.result()
+            total_pages += pages
+            total_properties += properties
+            logger.info(f"Replayed {futures[future]}: {pages} pages, {properties} properties")
+
+    logger.info(f"Replay finished: {total_pages} pages, {total_properties} properties")
+    return total_pages, total_properties
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Re-run extraction over archived Bayut pages")
+    parser.add_argument('archive', help="Archive directory written by the crawler's --archive-dir")
+    parser.add_argument('--kind', choices=['listing', 'detail'], help="Only replay this page kind")
+    parser.add_argument('--property-id', action='append', dest='property_ids',
+                        help="Only replay these property IDs (repeatable)")
+    parser.add_argument('--since', help="Only replay pages crawled at or after this ISO timestamp")
+    parser.add_argument('--workers', type=int, help="Worker processes (default: CPU count)")
+    parser.add_argument('--dry-run', action='store_true', help="Parse only, do not queue properties")
+    args = parser.parse_args()
+
+    replay(
+        args.archive,
+        kind=args.kind,
+        property_ids=set(args.property_ids) if args.property_ids else None,
+        since=args.since,
+        workers=args.workers,
+        dry_run=args.dry_run,
+    )
@@ -0,0 +1,154 @@
+from celery.signals import worker_process_shutdown
+from datetime import datetime, timedelta
+from itertools import islice
+from sqlalchemy import delete
+from sqlalchemy.dialects.postgresql import insert
+import httpx
+import logging
+import uuid
+from src.crawler.bayut import (
+    DEFAULT_BASE_URL, HTTP_HEADERS, BayutSeleniumScraper, listing_page_url, parse_page_count
+)
+from src.crawler.known_listings import KnownListingIndex
+from src.models.crawl import CrawlClaim
+from src.processor.celery_tasks import celery_app, get_engine
+
+logger = logging.getLogger(__name__)
+
+PAGES_QUEUE = 'crawl_pages'
+DETAIL_QUEUE = 'crawl_detail'
+
+# Detail workers keep one browser per process and recycle it periodically
+DETAIL_PAGES_PER_DRIVER = 50
+CLAIM_RETENTION = timedelta(days=7)
+
+_detail_scraper = None
+_detail_pages = 0
+
+
+def _claim(run_id, property_id):
+    """Claim a listing for this run; False if another shard already queued it."""
+    with get_engine().begin() as connection:
+        result = connection.execute(
+            insert(CrawlClaim)
+            .values(run_id=run_id, property_id=property_id, claimed_at=datetime.now())
+            .on_conflict_do_nothing()
+            .returning(CrawlClaim.property_id)
+        )
+        return result.first() is not None
+
+
+def _release(run_id, property_id):
+    """Drop a claim whose detail page could not be queued, so a retried shard queues it again."""
+    with get_engine().begin() as connection:
+        connection.execute(
+            delete(CrawlClaim).where(CrawlClaim.run_id == run_id, CrawlClaim.property_id == property_id)
+        )
+
+
+def _get_detail_scraper():
+    global _detail_scraper, _detail_pages
+    if _detail_scraper is None:
+        # One attempt per task run; crawl_detail's own retries are the only retry layer
+        _detail_scraper = BayutSeleniumScraper(detail_tab=False, profile='lean', max_retries=1)
+        _detail_pages = 0
+    return _detail_scraper
+
+
+@worker_process_shutdown.connect
+def _quit_detail_browser(**kwargs):
+    if _detail_scraper is not None:
+        _detail_scraper.restart_driver()
+
+
+@celery_app.task(bind=True, max_retries=3)
+def crawl_coordinator(self, base_url=DEFAULT_BASE_URL, pages_per_shard=10, max_pages=None,
+                      listing_mode='http', incremental=False):
+    """Discover the listing page count and fan the crawl out as page-range shards."""
+    run_id = uuid.uuid4().hex
+    try:
+        response = httpx.get(base_url, headers=HTTP_HEADERS, timeout=30, follow_redirects=True)
+        response.raise_for_status()
+    except httpx.HTTPError as e:
+        logger.error(f"Could not load first listing page: {str(e)}")
+        raise self.retry(exc=e, countdown=60)
+
+    page_count = parse_page_count(response.text)
+    if max_pages:
+        page_count = min(page_count, max_pages)
+
+    with get_engine().begin() as connection:
+        connection.execute(delete(CrawlClaim).where(CrawlClaim.claimed_at < datetime.now() - CLAIM_RETENTION))
+
+    shards = 0
+    for first_page in range(1, page_count + 1, pages_per_shard):
+        last_page = min(first_page + pages_per_shard - 1, page_count)
+        crawl_page_range.apply_async(
+            args=[run_id, base_url, first_page, last_page],
+            kwargs={'listing_mode': listing_mode, 'incremental': incremental},
+            queue=PAGES_QUEUE,
+        )
+        shards += 1
+
+    logger.info(f"Crawl {run_id}: {page_count} pages in {shards} shards")
+    return {'run_id': run_id, 'pages': page_count, 'shards': shards}
+
+
+@celery_app.task(bind=True, max_retries=3)
+def crawl_page_range(self, run_id, base_url, first_page, last_page, listing_mode='http', incremental=False):
+    """Walk listing pages ``first_page..last_page`` and queue each unclaimed listing's detail page."""
+    scraper = BayutSeleniumScraper(base_url=base_url, listing_mode=listing_mode)
+    known_listings = KnownListingIndex.from_database() if incremental else None
+    queued = 0
+    try:
+        page_count = last_page - first_page + 1
+        # max_pages keeps the HTTP fetch window inside the shard; islice stops the browser walk
+        pages = scraper._iter_listing_pages(
+            start_url=listing_page_url(base_url, first_page), start_page=first_page, max_pages=page_count
+        )
+        for page_url, listings in islice(pages, page_count):
+            for property_data, detail_url in listings:
+                property_id = property_data['property_id']
+                if known_listings is not None and property_id in known_listings:
+                    continue
+                if not _claim(run_id, property_id):
+                    continue
+                try:
+                    crawl_detail.apply_async(args=[detail_url, property_data], queue=DETAIL_QUEUE)
+                except Exception:
+                    _release(run_id, property_id)
+                    raise
+                queued += 1
+    except Exception as e:
+        logger.error(f"Shard {first_page}-{last_page} of crawl {run_id} failed: {str(e)}")
+        raise self.retry(exc=e, countdown=60)
+    finally:
+        scraper.restart_driver()
+
+    logger.info(f"Shard {first_page}-{last_page} of crawl {run_id} queued {queued} detail pages")
+    return queued
+
+
+@celery_app.task(bind=True, max_retries=3)
+def crawl_detail(self, detail_url, property_data):
+    """Scrape one detail page with this worker process's browser.
+
+    The scraper makes a single attempt; failures are retried here, with a
+    delay, up to ``max_retries`` times.
+    """
+    global _detail_pages
+    scraper = _get_detail_scraper()
+    success = scraper._get_property_details(detail_url, property_data)
+    _detail_pages += 1
+
+    if not success and not scraper.driver_alive():
+        logger.warning("Detail browser crashed, replacing it")
+        scraper.restart_driver()
+        _detail_pages = 0
+    elif _detail_pages >= DETAIL_PAGES_PER_DRIVER:
+        scraper.restart_driver()
+        _detail_pages = 0
+
+    if not success:
+        raise self.retry(countdown=60)
+    return property_data['property_id']
@@ -0,0 +1,166 @@
+"""Prometheus metrics shared by the crawler, the Celery workers and the API.
+
+The API serves them at ``/metrics``. Crawler and worker processes have no
+HTTP server, so :func:`start_exporter` pushes them to a Pushgateway or
+writes them to a node_exporter textfile directory (see ``src/api/config.py``).
+"""
+from time import perf_counter
+import atexit
+import logging
+import os
+import socket
+import threading
+from prometheus_client import REGISTRY, Counter, Histogram, push_to_gateway, write_to_textfile
+from sqlalchemy import event
+from src.api.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Page loads and Celery tasks run for seconds, queries for milliseconds
+SLOW_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+FAST_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 10)
+
+CRAWLER_STAGE_SECONDS = Histogram(
+    'crawler_stage_seconds', 'Time spent per crawler stage and page kind',
+    ['stage', 'kind'], buckets=SLOW_BUCKETS,
+)
+WEBDRIVER_COMMANDS = Counter(
+    'crawler_webdriver_commands', 'WebDriver commands sent to the browser', ['command'],
+)
+CELERY_TASK_SECONDS = Histogram(
+    'celery_task_duration_seconds', 'Celery task run time by final state',
+    ['task', 'state'], buckets=SLOW_BUCKETS,
+)
+CELERY_TASK_RETRIES = Counter(
+    'celery_task_retries', 'Celery task retries', ['task'],
+)
+DB_QUERY_SECONDS = Histogram(
+    'db_query_duration_seconds', 'SQL statement execution time by statement type',
+    ['operation'], buckets=FAST_BUCKETS,
+)
+HTTP_REQUEST_SECONDS = Histogram(
+    'http_request_duration_seconds', 'API request time until the response starts',
+    ['method', 'route', 'status'], buckets=FAST_BUCKETS,
+)
+
+
+def crawler_stage(stage, kind):
+    """Context manager timing one crawler stage: ``page_load``, ``wait``, ``extract`` or ``enqueue``."""
+    return CRAWLER_STAGE_SECONDS.labels(stage, kind).time()
+
+
+def instrument_webdriver(driver):
+    """Count every WebDriver round trip; elements send their commands through the driver too."""
+    execute = driver.execute
+
+    def counted_execute(driver_command, params=None):
+        WEBDRIVER_COMMANDS.labels(driver_command).inc()
+        return execute(driver_command, params)
+
+    driver.execute = counted_execute
+    return driver
+
+
+def instrument_engine(engine):
+    """Time every statement run through a (sync) engine; pass ``engine.sync_engine`` for async engines."""
+    @event.listens_for(engine, 'before_cursor_execute')
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('query_started', []).append(perf_counter())
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = perf_counter() - conn.info['query_started'].pop()
+        operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else 'UNKNOWN'
+        DB_QUERY_SECONDS.labels(operation).observe(elapsed)
+
+    @event.listens_for(engine, 'handle_error')
+    def handle_error(context):
+        # A failed statement never reaches after_cursor_execute
+        if context.connection is not None and context.connection.info.get('query_started'):
+            context.connection.info['query_started'].pop()
+
+    return engine
+
+
+_task_started = {}
+
+
+def _task_prerun(task_id=None, **kwargs):
+    _task_started[task_id] = perf_counter()
+
+
+def _task_postrun(task_id=None, task=None, state=None, **kwargs):
+    started = _task_started.pop(task_id, None)
+    if started is not None:
+        CELERY_TASK_SECONDS.labels(task.name, state or 'UNKNOWN').observe(perf_counter() - started)
+
+
+def _task_retry(sender=None, **kwargs):
+    CELERY_TASK_RETRIES.labels(sender.name).inc()
+
+
+def instrument_celery():
+    """Record task durations and retries through Celery's signals."""
+    from celery.signals import task_postrun, task_prerun, task_retry
+    task_prerun.connect(_task_prerun, weak=False, dispatch_uid='metrics_task_prerun')
+    task_postrun.connect(_task_postrun, weak=False, dispatch_uid='metrics_task_postrun')
+    task_retry.connect(_task_retry, weak=False, dispatch_uid='metrics_task_retry')
+
+
+_exporter_pid = None
+_instance = None
+
+
+def metrics_instance(worker_index=None):
+    """``METRICS_INSTANCE`` (default: the hostname), suffixed with a pool worker's index.
+
+    Stable across restarts, so a restarted process replaces its predecessor's
+    series instead of leaving them behind.
+    """
+    instance = settings.metrics_instance or socket.gethostname()
+    return instance if worker_index is None else f"{instance}-{worker_index}"
+
+
+def _textfile_path(job):
+    return os.path.join(settings.metrics_textfile_dir, f"{job}-{_instance or metrics_instance()}.prom")
+
+
+def export_metrics(job):
+    """Push or write this process's metrics once; a no-op unless an exporter is configured."""
+    try:
+        if settings.metrics_pushgateway_url:
+            push_to_gateway(settings.metrics_pushgateway_url, job=job, registry=REGISTRY,
+                            grouping_key={'instance': _instance or metrics_instance()})
+        elif settings.metrics_textfile_dir:
+            write_to_textfile(_textfile_path(job), REGISTRY)
+    except OSError as e:
+        logger.warning(f"Could not export metrics: {str(e)}")
+
+
+def start_exporter(job, worker_index=None):
+    """Export this process's metrics every ``metrics_export_interval`` seconds and once more at exit.
+
+    Each process exports its own series, grouped under :func:`metrics_instance`,
+    so it is safe to call in every forked worker process. The final export
+    is kept, so short batch runs still report; a restarted process replaces
+    it. Processes of the same job on one host need distinct ``worker_index``
+    values or ``METRICS_INSTANCE`` settings.
+    """
+    global _exporter_pid, _instance
+    if not (settings.metrics_pushgateway_url or settings.metrics_textfile_dir) or _exporter_pid == os.getpid():
+        return
+    _exporter_pid = os.getpid()
+    _instance = metrics_instance(worker_index)
+    stopped = threading.Event()
+
+    def export_periodically():
+        while not stopped.wait(settings.metrics_export_interval):
+            export_metrics(job)
+
+    threading.Thread(target=export_periodically, name='metrics-exporter', daemon=True).start()
+
+    def export_at_exit():
+        stopped.set()
+        export_metrics(job)
+
+    atexit.register(export_at_exit)
@@ -0,0 +1,15 @@
+from sqlalchemy import Column, String, DateTime
+from datetime import datetime
+from src.models.property import Base
+
+
+class CrawlClaim(Base):
+    """A listing claimed by a distributed crawl run, so only one shard queues its detail page."""
+    __tablename__ = 'crawl_claims'
+
+    run_id = Column(String, primary_key=True)
+    property_id = Column(String, primary_key=True)
+    claimed_at = Column(DateTime, default=datetime.now, index=True)
+
+    def __repr__(self):
+        return f"<CrawlClaim(run_id={self.run_id}, property_id={self.property_id})>"
@@ -0,0 +1,44 @@
+from sqlalchemy import Column, String, Integer, BigInteger, Float, Date, DateTime, Index
+from datetime import datetime
+from src.models.property import Base
+
+
+class PriceHistory(Base):
+    """Append-only log of listing prices, one row each time a listing's price is first seen or changes."""
+    __tablename__ = 'price_history'
+
+    id = Column(BigInteger, primary_key=True)
+    property_id = Column(String, nullable=False)
+    region = Column(String, nullable=True)
+    price_aed = Column(Float, nullable=False)
+    previous_price_aed = Column(Float, nullable=True)
+    recorded_at = Column(DateTime, default=datetime.now, nullable=False)
+
+    __table_args__ = (
+        Index('ix_price_history_property_id_recorded_at', 'property_id', 'recorded_at'),
+    )
+
+    def __repr__(self):
+        return f"<PriceHistory(property_id={self.property_id}, price_aed={self.price_aed})>"
+
+
+class PriceTrendBucket(Base):
+    """Price observations aggregated per region and day or week, maintained with ``price_history``."""
+    __tablename__ = 'price_trend_buckets'
+
+    granularity = Column(String, primary_key=True)  # 'day' or 'week'
+    bucket_start = Column(Date, primary_key=True)
+    # Listings without a region are counted under ''
+    region = Column(String, primary_key=True)
+    observation_count = Column(Integer, nullable=False, default=0)
+    price_sum = Column(Float, nullable=False, default=0)
+    min_price = Column(Float, nullable=True)
+    max_price = Column(Float, nullable=True)
+    # Changes of an already-known price
+    change_count = Column(Integer, nullable=False, default=0)
+    increase_count = Column(Integer, nullable=False, default=0)
+    decrease_count = Column(Integer, nullable=False, default=0)
+    change_pct_sum = Column(Float, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<PriceTrendBucket(granularity={self.granularity}, bucket_start={self.bucket_start}, region={self.region})>"
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, Boolean, Float, DateTime, JSON, Text
+from sqlalchemy import Column, String, Integer, Boolean, Float, DateTime, JSON, Text, Index
 from sqlalchemy.ext.declarative import declarative_base
 from datetime import datetime
 
@@ -13,23 +13,38 @@ class Property(Base):
     title = Column(Text)
     price = Column(String, nullable=True)
     location = Column(String)
-    region = Column(String)
+    region = Column(String, index=True)
     property_type = Column(String)
     purpose = Column(String)
     country = Column(String)
     beds = Column(String, nullable=True)
     baths = Column(String, nullable=True)
     area = Column(String, nullable=True)
+
+    # Typed values parsed from price/area/beds/baths at ingest (src/processor/normalize.py)
+    price_aed = Column(Float, nullable=True)
+    area_sqft = Column(Float, nullable=True)
+    beds_int = Column(Integer, nullable=True)
+    baths_int = Column(Integer, nullable=True)
+
     image_url = Column(String)
     latitude = Column(Float)
     longitude = Column(Float)
+    # Computed at ingest (src/processor/geo.py); "C" collation so prefix ranges follow the base32 order
+    geohash = Column(String(12, collation='C'), nullable=True, index=True)
     created_at = Column(DateTime, default=datetime.now)
-    updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
+    # Part of the /listings keyset cursor, so never NULL
+    updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now, nullable=False)
     crawl_timestamp = Column(String)
     
     # Additional fields
     features = Column(JSON)
-    last_checked = Column(DateTime, default=datetime.now)
+    last_checked = Column(DateTime, default=datetime.now, index=True)
+    price_change_count = Column(Integer, default=0)
+    # Detail fetches that failed since the last successful one; the recrawl scheduler gives up after a few
+    failed_checks = Column(Integer, default=0)
+    # Hash of the scraped fields; unchanged re-scrapes only touch last_checked
+    content_hash = Column(String(64), nullable=True)
     reference = Column(String)
     completion_status = Column(String)
     furnishing = Column(String)
@@ -73,5 +88,13 @@ class Property(Base):
     floorplan_type = Column(String, nullable=True)
     floorplan_rooms = Column(String, nullable=True)
     
+    __table_args__ = (
+        Index('ix_properties_region_price_aed', 'region', 'price_aed'),
+        # Keyset pagination of /listings, newest first, optionally narrowed by region or type
+        Index('ix_properties_updated_at_id', 'updated_at', 'id'),
+        Index('ix_properties_region_updated_at_id', 'region', 'updated_at', 'id'),
+        Index('ix_properties_property_type_updated_at_id', 'property_type', 'updated_at', 'id'),
+    )
+
     def __repr__(self):
         return f"<Property(id={self.property_id}, title={self.title})>"
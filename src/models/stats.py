@@ -0,0 +1,46 @@
+from sqlalchemy import Column, String, Integer, BigInteger, Float, DateTime, LargeBinary
+from datetime import datetime
+from src.models.property import Base
+
+
+class RegionStats(Base):
+    """Per-region listing aggregates, kept in step with ``properties`` at ingest."""
+    __tablename__ = 'region_stats'
+
+    # Listings without a region are counted under '' (primary keys cannot be NULL)
+    region = Column(String, primary_key=True)
+    listing_count = Column(Integer, nullable=False, default=0)
+    trucheck_count = Column(Integer, nullable=False, default=0)
+    price_count = Column(Integer, nullable=False, default=0)
+    price_sum = Column(Float, nullable=False, default=0)
+    min_price = Column(Float, nullable=True)
+    max_price = Column(Float, nullable=True)
+    updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
+
+    def __repr__(self):
+        return f"<RegionStats(region={self.region}, listing_count={self.listing_count})>"
+
+
+class DataVersion(Base):
+    """Counter bumped in every ingest transaction that changes listings; API caches key on it."""
+    __tablename__ = 'data_versions'
+
+    name = Column(String, primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
+
+    def __repr__(self):
+        return f"<DataVersion(name={self.name}, version={self.version})>"
+
+
+class PriceSketch(Base):
+    """Serialized t-digest of a price metric for one region (src/processor/sketches.py)."""
+    __tablename__ = 'price_sketches'
+
+    region = Column(String, primary_key=True)
+    metric = Column(String, primary_key=True)
+    digest = Column(LargeBinary, nullable=False)
+    updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
+
+    def __repr__(self):
+        return f"<PriceSketch(region={self.region}, metric={self.metric})>"
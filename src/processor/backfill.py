@@ -0,0 +1,109 @@
+import argparse
+import logging
+from sqlalchemy import bindparam, create_engine, inspect, select, text, update
+from src.api.config import settings
+from src.models.property import Base, Property
+from src.models.history import PriceHistory  # registers price_history with Base.metadata
+from src.models.stats import RegionStats  # registers region_stats with Base.metadata
+from src.processor.geo import add_geohash
+from src.processor.ingest import PROPERTY_COLUMNS, VOLATILE_FIELDS, compute_content_hash
+from src.processor.normalize import TYPED_COLUMNS, normalize_property
+from src.processor.price_history import rebuild_trend_buckets, seed_price_history
+from src.processor.region_stats import reconcile_region_stats
+from src.processor.sketches import rebuild_price_sketches
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def sync_schema(engine):
+    """Create missing tables, then add model columns and indexes an existing database lacks."""
+    Base.metadata.create_all(engine)
+    inspector = inspect(engine)
+    with engine.begin() as connection:
+        for table in Base.metadata.sorted_tables:
+            existing = {column['name'] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                column_type = column.type.compile(dialect=engine.dialect)
+                connection.execute(text(
+                    f'ALTER TABLE {table.name} ADD COLUMN IF NOT EXISTS {column.name} {column_type}'
+                ))
+                logger.info(f"Added column {table.name}.{column.name}")
+            for index in table.indexes:
+                index.create(connection, checkfirst=True)
+        # Rows stored before updated_at became NOT NULL
+        columns = {column['name']: column for column in inspector.get_columns('properties')}
+        if columns['updated_at']['nullable']:
+            result = connection.execute(text(
+                'UPDATE properties SET updated_at = COALESCE(created_at, last_checked, now()) WHERE updated_at IS NULL'
+            ))
+            connection.execute(text('ALTER TABLE properties ALTER COLUMN updated_at SET NOT NULL'))
+            logger.info(f"Made properties.updated_at NOT NULL ({result.rowcount} rows filled)")
+
+
+# Columns computed at ingest, and the stored columns they are computed from
+DERIVED_COLUMNS = [*TYPED_COLUMNS, 'geohash', 'content_hash']
+SOURCE_COLUMNS = sorted(PROPERTY_COLUMNS - VOLATILE_FIELDS - {*TYPED_COLUMNS, 'geohash'})
+
+
+def backfill_derived_columns(engine, chunk_size=5000):
+    """Recompute the typed numeric columns, geohash and content hash of every stored listing, walking the table by ``id``.
+
+    Each chunk is its own transaction, so the backfill can be interrupted and
+    re-run. ``updated_at`` is left alone: the listing content did not change.
+    """
+    table = Property.__table__
+    sources = [table.c[source] for source in SOURCE_COLUMNS]
+    statement = (
+        update(table)
+        .where(table.c.id == bindparam('row_id'))
+        .values(updated_at=table.c.updated_at, **{column: bindparam(f'new_{column}') for column in DERIVED_COLUMNS})
+    )
+
+    last_id = 0
+    total = 0
+    while True:
+        with engine.begin() as connection:
+            rows = connection.execute(
+                select(table.c.id, *sources).where(table.c.id > last_id).order_by(table.c.id).limit(chunk_size)
+            ).all()
+            if not rows:
+                break
+            params = []
+            for row in rows:
+                derived = add_geohash(normalize_property({source: row._mapping[source] for source in SOURCE_COLUMNS}))
+                derived['content_hash'] = compute_content_hash(derived)
+                values = {f'new_{column}': derived.get(column) for column in DERIVED_COLUMNS}
+                values['row_id'] = row.id
+                params.append(values)
+            connection.execute(statement, params)
+        last_id = rows[-1].id
+        total += len(rows)
+        logger.info(f"Backfilled {total} listings (up to id {last_id})")
+    return total
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Add the derived columns and fill them for stored listings")
+    parser.add_argument('--chunk-size', type=int, default=5000, help="Rows updated per transaction")
+    parser.add_argument('--schema-only', action='store_true', help="Only add missing columns and indexes")
+    args = parser.parse_args()
+
+    engine = create_engine(settings.database_url)
+    try:
+        sync_schema(engine)
+        if not args.schema_only:
+            backfill_derived_columns(engine, chunk_size=args.chunk_size)
+            # Prices changed underneath the rollups
+            with engine.begin() as connection:
+                reconcile_region_stats(connection)
+            with engine.begin() as connection:
+                rebuild_price_sketches(connection)
+            # Start the price history of listings stored before it existed
+            with engine.begin() as connection:
+                logger.info(f"Seeded price history for {seed_price_history(connection)} listings")
+                rebuild_trend_buckets(connection)
+    finally:
+        engine.dispose()
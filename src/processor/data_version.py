@@ -0,0 +1,20 @@
+from datetime import datetime
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from src.models.stats import DataVersion
+
+# Version of everything derived from ``properties``
+PROPERTIES_VERSION = 'properties'
+
+
+def bump_data_version(connection, name=PROPERTIES_VERSION):
+    """Increment a data version inside the caller's transaction, so it becomes visible on commit."""
+    statement = insert(DataVersion).values(name=name, version=1, updated_at=datetime.now())
+    connection.execute(statement.on_conflict_do_update(
+        index_elements=[DataVersion.name],
+        set_={'version': DataVersion.version + 1, 'updated_at': statement.excluded.updated_at},
+    ))
+
+
+def data_version_query(name=PROPERTIES_VERSION):
+    return select(DataVersion.version).where(DataVersion.name == name)
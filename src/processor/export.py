@@ -0,0 +1,178 @@
+from datetime import date, datetime
+import argparse
+import csv
+import io
+import json
+import logging
+import sys
+from sqlalchemy import Boolean, DateTime, Float, Integer, JSON, create_engine, select
+from src.api.config import settings
+from src.models.property import Property
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+EXPORT_FORMATS = ('ndjson', 'csv', 'parquet')
+EXPORT_CHUNK_SIZE = 1000
+COLUMNS = {column.name: column for column in Property.__table__.columns}
+
+
+def listing_filters(region=None, location=None, property_type=None, min_price=None, max_price=None,
+                    beds=None, truchecked=None):
+    """WHERE conditions shared by the listing search, map and export queries."""
+    conditions = []
+    if region is not None:
+        conditions.append(Property.region == region)
+    if location is not None:
+        conditions.append(Property.location == location)
+    if property_type is not None:
+        conditions.append(Property.property_type == property_type)
+    if min_price is not None:
+        conditions.append(Property.price_aed >= min_price)
+    if max_price is not None:
+        conditions.append(Property.price_aed <= max_price)
+    if beds is not None:
+        conditions.append(Property.beds_int == beds)
+    if truchecked is not None:
+        conditions.append(Property.trucheck_date.isnot(None) if truchecked else Property.trucheck_date.is_(None))
+    return conditions
+
+
+def export_columns(names=None):
+    """Model columns to export, all of them by default; raises ``ValueError`` for unknown names."""
+    if not names:
+        return list(COLUMNS.values())
+    unknown = [name for name in names if name not in COLUMNS]
+    if unknown:
+        raise ValueError(f"Unknown columns: {', '.join(unknown)}")
+    return [COLUMNS[name] for name in names]
+
+
+def export_query(columns, conditions=(), chunk_size=EXPORT_CHUNK_SIZE):
+    """Listings in ``id`` order, fetched through a server-side cursor ``chunk_size`` rows at a time."""
+    return (
+        select(*columns)
+        .where(*conditions)
+        .order_by(Property.id)
+        .execution_options(stream_results=True, yield_per=chunk_size)
+    )
+
+
+def _plain(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def ndjson_chunk(names, rows):
+    lines = [
+        json.dumps({name: _plain(value) for name, value in zip(names, row)}, ensure_ascii=False)
+        for row in rows
+    ]
+    return ('\n'.join(lines) + '\n').encode('utf-8')
+
+
+def csv_header(names):
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(names)
+    return buffer.getvalue().encode('utf-8')
+
+
+def csv_chunk(rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow([
+            json.dumps(value, ensure_ascii=False) if isinstance(value, (dict, list)) else _plain(value)
+            for value in row
+        ])
+    return buffer.getvalue().encode('utf-8')
+
+
+def _arrow_type(pa, column):
+    if isinstance(column.type, Boolean):
+        return pa.bool_()
+    if isinstance(column.type, Integer):
+        return pa.int64()
+    if isinstance(column.type, Float):
+        return pa.float64()
+    if isinstance(column.type, DateTime):
+        return pa.timestamp('us')
+    return pa.string()
+
+
+def write_parquet(connection, path, columns, conditions=(), chunk_size=EXPORT_CHUNK_SIZE):
+    """Stream the export into a Parquet file, one row group per ``chunk_size`` rows."""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise RuntimeError("Parquet export needs pyarrow (pip install pyarrow)") from e
+
+    schema = pa.schema([(column.name, _arrow_type(pa, column)) for column in columns])
+    json_columns = {index for index, column in enumerate(columns) if isinstance(column.type, JSON)}
+    total = 0
+    result = connection.execute(export_query(columns, conditions, chunk_size))
+    with pq.ParquetWriter(path, schema, compression='zstd') as writer:
+        for rows in result.partitions():
+            values = [list(column) for column in zip(*rows)]
+            for index in json_columns:
+                values[index] = [None if value is None else json.dumps(value, ensure_ascii=False)
+                                 for value in values[index]]
+            writer.write_table(pa.Table.from_arrays(values, schema=schema))
+            total += len(rows)
+    return total
+
+
+def export(connection, output, export_format, columns, conditions=(), chunk_size=EXPORT_CHUNK_SIZE):
+    """Write the matching listings to the binary file ``output``; returns the row count."""
+    names = [column.name for column in columns]
+    if export_format == 'csv':
+        output.write(csv_header(names))
+    total = 0
+    result = connection.execute(export_query(columns, conditions, chunk_size))
+    for rows in result.partitions():
+        output.write(ndjson_chunk(names, rows) if export_format == 'ndjson' else csv_chunk(rows))
+        total += len(rows)
+    return total
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export stored listings as NDJSON, CSV or Parquet")
+    parser.add_argument('--format', choices=EXPORT_FORMATS, default='ndjson')
+    parser.add_argument('--output', '-o', help="Output file (default: stdout; required for parquet)")
+    parser.add_argument('--columns', help="Comma-separated columns to export (default: all)")
+    parser.add_argument('--chunk-size', type=int, default=EXPORT_CHUNK_SIZE, help="Rows fetched per round trip")
+    parser.add_argument('--region')
+    parser.add_argument('--location')
+    parser.add_argument('--property-type')
+    parser.add_argument('--min-price', type=float)
+    parser.add_argument('--max-price', type=float)
+    parser.add_argument('--beds', type=int)
+    parser.add_argument('--truchecked', action=argparse.BooleanOptionalAction, default=None)
+    args = parser.parse_args()
+
+    if args.format == 'parquet' and not args.output:
+        parser.error("--output is required for parquet")
+    try:
+        columns = export_columns(args.columns.split(',') if args.columns else None)
+    except ValueError as e:
+        parser.error(str(e))
+    conditions = listing_filters(
+        region=args.region, location=args.location, property_type=args.property_type,
+        min_price=args.min_price, max_price=args.max_price, beds=args.beds, truchecked=args.truchecked,
+    )
+
+    engine = create_engine(settings.database_url)
+    try:
+        with engine.connect() as connection:
+            if args.format == 'parquet':
+                total = write_parquet(connection, args.output, columns, conditions, args.chunk_size)
+            elif args.output:
+                with open(args.output, 'wb') as output:
+                    total = export(connection, output, args.format, columns, conditions, args.chunk_size)
+            else:
+                total = export(connection, sys.stdout.buffer, args.format, columns, conditions, args.chunk_size)
+        logger.info(f"Exported {total} listings")
+    finally:
+        engine.dispose()
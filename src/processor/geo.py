@@ -0,0 +1,110 @@
+import math
+
+BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+GEOHASH_PRECISION = 9
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+# Upper bound on prefix ranges a bounding-box query is split into
+MAX_COVER_CELLS = 64
+
+
+def encode_geohash(latitude, longitude, precision=GEOHASH_PRECISION):
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    chars = []
+    bit = 0
+    value = 0
+    even = True
+    while len(chars) < precision:
+        interval, coordinate = (lon_range, longitude) if even else (lat_range, latitude)
+        middle = (interval[0] + interval[1]) / 2
+        if coordinate >= middle:
+            value = value * 2 + 1
+            interval[0] = middle
+        else:
+            value *= 2
+            interval[1] = middle
+        even = not even
+        bit += 1
+        if bit == 5:
+            chars.append(BASE32[value])
+            bit = 0
+            value = 0
+    return ''.join(chars)
+
+
+def decode_geohash(geohash):
+    """Centre ``(latitude, longitude)`` of a geohash cell."""
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    even = True
+    for char in geohash:
+        value = BASE32.index(char)
+        for shift in range(4, -1, -1):
+            interval = lon_range if even else lat_range
+            middle = (interval[0] + interval[1]) / 2
+            if value >> shift & 1:
+                interval[0] = middle
+            else:
+                interval[1] = middle
+            even = not even
+    return (lat_range[0] + lat_range[1]) / 2, (lon_range[0] + lon_range[1]) / 2
+
+
+def cell_size(precision):
+    """``(height, width)`` of a geohash cell in degrees."""
+    bits = 5 * precision
+    return 180 / 2 ** (bits // 2), 360 / 2 ** ((bits + 1) // 2)
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def radius_box(latitude, longitude, radius_km):
+    """``(min_lat, min_lon, max_lat, max_lon)`` enclosing a circle."""
+    lat_delta = radius_km / KM_PER_DEGREE
+    lon_delta = radius_km / (KM_PER_DEGREE * max(math.cos(math.radians(latitude)), 1e-6))
+    return (
+        max(latitude - lat_delta, -90.0), max(longitude - lon_delta, -180.0),
+        min(latitude + lat_delta, 90.0), min(longitude + lon_delta, 180.0),
+    )
+
+
+def cover_bbox(min_lat, min_lon, max_lat, max_lon, max_cells=MAX_COVER_CELLS):
+    """The finest set of geohash cells (at most ``max_cells``) covering a bounding box.
+
+    Every listing in the box has a geohash starting with one of the returned
+    prefixes, so the box becomes a handful of index range scans.
+    """
+    cells = {''}
+    for precision in range(1, GEOHASH_PRECISION + 1):
+        height, width = cell_size(precision)
+        rows = math.floor(max_lat / height) - math.floor(min_lat / height) + 1
+        columns = math.floor(max_lon / width) - math.floor(min_lon / width) + 1
+        if rows * columns > max_cells:
+            break
+        lats = [min(min_lat + i * height, max_lat) for i in range(rows + 1)]
+        lons = [min(min_lon + i * width, max_lon) for i in range(columns + 1)]
+        cells = {encode_geohash(lat, lon, precision) for lat in lats for lon in lons}
+    return sorted(cells)
+
+
+def add_geohash(cleaned_data):
+    """Set ``geohash`` on a cleaned record that carries coordinates."""
+    if 'latitude' not in cleaned_data and 'longitude' not in cleaned_data:
+        return cleaned_data
+    try:
+        latitude = float(cleaned_data.get('latitude'))
+        longitude = float(cleaned_data.get('longitude'))
+    except (TypeError, ValueError):
+        cleaned_data['geohash'] = None
+        return cleaned_data
+    if -90 <= latitude <= 90 and -180 <= longitude <= 180 and (latitude, longitude) != (0.0, 0.0):
+        cleaned_data['geohash'] = encode_geohash(latitude, longitude)
+    else:
+        cleaned_data['geohash'] = None
+    return cleaned_data
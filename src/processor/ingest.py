@@ -0,0 +1,194 @@
+from collections import defaultdict, namedtuple
+from datetime import datetime
+import hashlib
+import json
+from sqlalchemy import Boolean, and_, case, func, literal_column, select, update
+from sqlalchemy.dialects.postgresql import insert
+from src.models.property import Property
+from src.processor.data_version import bump_data_version
+from src.processor.geo import add_geohash
+from src.processor.normalize import normalize_property
+from src.processor.price_history import record_price_changes, update_trend_buckets
+from src.processor.region_stats import LISTING_STATE_COLUMNS, apply_region_deltas, listing_state, lock_listings
+from src.processor.sketches import update_price_sketches
+
+# Columns a scraped dict may set; ``id`` is the surrogate key
+PROPERTY_COLUMNS = {column.name for column in Property.__table__.columns} - {'id'}
+
+# NOT NULL columns with a default, which takes over when a record has them empty
+DEFAULTED_COLUMNS = {
+    column.name for column in Property.__table__.columns if not column.nullable and column.default is not None
+}
+
+# Bookkeeping columns that change on every scrape and are left out of the content hash
+VOLATILE_FIELDS = {
+    'crawl_timestamp', 'last_checked', 'created_at', 'updated_at', 'price_change_count', 'failed_checks',
+    'content_hash',
+}
+
+# Columns the content hash covers
+CONTENT_COLUMNS = sorted(PROPERTY_COLUMNS - VOLATILE_FIELDS)
+
+# ``ListingState`` by property ID before (stored listings only) and after an
+# upsert, and the ``price_history`` rows it wrote
+ListingChanges = namedtuple('ListingChanges', ['old', 'new', 'history'])
+
+# Renamed before normalisation, so a legacy ``area_sqft`` string still ends up in
+# ``area`` and the typed ``area_sqft`` column is always derived from it.
+LEGACY_FIELD_NAMES = {
+    'area_sqft': 'area',
+    'bedrooms': 'beds',
+    'bathrooms': 'baths',
+}
+
+
+def compute_content_hash(cleaned_data):
+    """SHA-256 of the record's canonical JSON, ignoring bookkeeping fields.
+
+    Empty fields are left out too: a stored row cannot tell them from absent
+    ones, so the hash of an exported row matches the one of its scrape.
+    ``upsert_properties`` hashes incoming rows overlaid on the stored listing,
+    so the stored hash always covers the whole listing.
+    """
+    content = {
+        key: value for key, value in cleaned_data.items() if key not in VOLATILE_FIELDS and value is not None
+    }
+    canonical = json.dumps(content, sort_keys=True, separators=(',', ':'), ensure_ascii=False, default=str)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def clean_property_data(property_data):
+    """Rename legacy field names to the model's, drop keys that are not columns
+    (and empty ``DEFAULTED_COLUMNS``), parse the typed numeric columns and
+    geohash and add the content hash."""
+    cleaned_data = {}
+    for key, value in property_data.items():
+        key = LEGACY_FIELD_NAMES.get(key, key)
+        if value is None and key in DEFAULTED_COLUMNS:
+            continue
+        if key in PROPERTY_COLUMNS:
+            cleaned_data[key] = value
+    normalize_property(cleaned_data)
+    add_geohash(cleaned_data)
+    cleaned_data['content_hash'] = compute_content_hash(cleaned_data)
+    return cleaned_data
+
+
+def stored_content(connection, property_ids):
+    """``{property_id: {column: value}}`` of the ``CONTENT_COLUMNS`` of the stored listings among ``property_ids``."""
+    table = Property.__table__
+    result = connection.execute(
+        select(*(table.c[column] for column in CONTENT_COLUMNS)).where(table.c.property_id.in_(property_ids))
+    )
+    return {row.property_id: dict(row._mapping) for row in result}
+
+
+def upsert_properties(connection, rows):
+    """Insert or update cleaned property rows with ``INSERT ... ON CONFLICT (property_id) DO UPDATE``.
+
+    Rows sharing a ``property_id`` are merged (later values win) and grouped by
+    their column set, so a batch normally costs one statement. Only the
+    columns present in a row are overwritten on conflict, and only when the
+    ``content_hash`` of the row laid over the stored listing differs, so a
+    partial row (a recrawl's detail fields) can match a full scrape.
+    Unchanged listings just get ``last_checked`` bumped (and ``failed_checks``
+    cleared), leaving ``updated_at`` alone. Price changes go to
+    ``price_history`` in the same transaction. The shared rollup and version
+    rows are left to ``apply_listing_changes``, after commit. Returns
+    ``(written, unchanged, ListingChanges)``.
+
+    Whether a listing is new is taken from the upsert itself, and listings
+    are locked in a fixed order (see ``lock_listings``), so concurrent
+    batches only wait on each other for the listings they share.
+    """
+    now = datetime.now()
+    latest = {}
+    for row in rows:
+        if row['property_id'] in latest:
+            row = {**latest[row['property_id']], **row}
+        latest[row['property_id']] = row
+
+    table = Property.__table__
+    old_state = lock_listings(connection, list(latest))
+    # Read under the locks, so the hashes are taken over what the upsert overwrites
+    stored = stored_content(connection, list(latest))
+
+    groups = defaultdict(list)
+    for property_id, row in latest.items():
+        row = dict(row, last_checked=now, failed_checks=0)
+        if 'content_hash' in row:
+            row['content_hash'] = compute_content_hash({**stored.get(property_id, {}), **row})
+        groups[tuple(sorted(row))].append(row)
+    new_state = {}
+    for columns, group in groups.items():
+        statement = insert(table).values(group)
+        excluded = statement.excluded
+        update_columns = {column: excluded[column] for column in columns if column != 'property_id'}
+        update_columns['updated_at'] = now
+        if 'price' in columns:
+            # Track how often the price moves; the recrawl scheduler favours volatile listings
+            update_columns['price_change_count'] = func.coalesce(table.c.price_change_count, 0) + case(
+                (and_(table.c.price.isnot(None), table.c.price.is_distinct_from(excluded.price)), 1),
+                else_=0,
+            )
+        if 'content_hash' in columns:
+            upsert = statement.on_conflict_do_update(
+                index_elements=[table.c.property_id],
+                set_=update_columns,
+                where=table.c.content_hash.is_distinct_from(excluded.content_hash),
+            )
+        else:
+            upsert = statement.on_conflict_do_update(index_elements=[table.c.property_id], set_=update_columns)
+        # xmax is 0 only on a freshly inserted row version
+        inserted = literal_column('xmax = 0', Boolean)
+        result = connection.execute(upsert.returning(table.c.property_id, inserted, *LISTING_STATE_COLUMNS))
+        for property_id, was_inserted, *state in result:
+            new_state[property_id] = listing_state(*state)
+            if was_inserted:
+                # New or not, the upsert decides; the pre-read only supplies the old values
+                old_state.pop(property_id, None)
+    history = record_price_changes(connection, old_state, new_state, now)
+
+    unchanged = [property_id for property_id in latest if property_id not in new_state]
+    if unchanged:
+        connection.execute(
+            update(table)
+            .where(table.c.property_id.in_(unchanged))
+            .values(last_checked=now, failed_checks=0, updated_at=table.c.updated_at)
+        )
+    return len(new_state), len(unchanged), ListingChanges(old_state, new_state, history)
+
+
+def apply_listing_changes(engine, changes):
+    """Fold committed listing changes into ``region_stats``, the trend buckets
+    and the price sketches, then bump the data version.
+
+    Every batch of a region updates the same rows here, so each rollup is
+    committed on its own and a batch never holds one rollup's rows while it
+    works on the next. The deltas add up in any order, so batches may apply
+    them in a different order than they committed.
+    """
+    with engine.begin() as connection:
+        apply_region_deltas(connection, changes.old, changes.new)
+    with engine.begin() as connection:
+        update_trend_buckets(connection, changes.history)
+    with engine.begin() as connection:
+        update_price_sketches(connection, changes.old, changes.new)
+    with engine.begin() as connection:
+        bump_data_version(connection)
+
+
+def ingest_properties(engine, rows):
+    """``upsert_properties`` in one transaction, then ``apply_listing_changes`` after it commits.
+
+    The rollup and version rows are only locked for a statement or two each,
+    not while the batch is written. If the process dies in between, the
+    periodic ``reconcile_region_stats`` and ``rebuild_price_sketches``
+    restore what was lost (``rebuild_trend_buckets`` for the trends).
+    Returns ``(written, unchanged)``.
+    """
+    with engine.begin() as connection:
+        written, unchanged, changes = upsert_properties(connection, rows)
+    if changes.new:
+        apply_listing_changes(engine, changes)
+    return written, unchanged
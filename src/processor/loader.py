@@ -0,0 +1,320 @@
+from collections import defaultdict
+from datetime import datetime
+from itertools import islice
+import argparse
+import csv
+import gzip
+import io
+import json
+import logging
+import multiprocessing
+import sys
+import time
+from sqlalchemy import (
+    JSON, Boolean, Column, DateTime, Float, Integer, MetaData, Table, and_, case, create_engine, func, literal, select,
+    text, update,
+)
+from sqlalchemy.dialects.postgresql import insert
+from src.api.config import settings
+from src.models.history import PriceHistory
+from src.models.property import Property
+from src.processor.backfill import sync_schema
+from src.processor.data_version import bump_data_version
+from src.processor.ingest import LEGACY_FIELD_NAMES, clean_property_data, compute_content_hash
+from src.processor.normalize import TYPED_COLUMNS
+from src.processor.price_history import rebuild_trend_buckets
+from src.processor.region_stats import reconcile_region_stats
+from src.processor.sketches import rebuild_price_sketches
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+LOAD_FORMATS = ('ndjson', 'csv')
+LOAD_CHUNK_SIZE = 50_000
+COPY_NULL = r'\N'
+
+# Exported columns that ingest computes or that belong to the exporting database's crawl.
+# Dropped on read: an exported ``area_sqft`` would otherwise be renamed onto ``area``.
+COMPUTED_COLUMNS = {*TYPED_COLUMNS, 'geohash', 'content_hash', 'id', 'last_checked', 'failed_checks'}
+
+
+def _is_number(value):
+    if isinstance(value, (int, float)):
+        return True
+    try:
+        float(value)
+    except (TypeError, ValueError):
+        return False
+    return True
+
+
+def _drop_computed(row):
+    """``row`` without its ``COMPUTED_COLUMNS``.
+
+    A legacy field sharing a computed column's name (``area_sqft``) is kept
+    for ``clean_property_data`` to rename, unless the row also has the field
+    it is renamed to or its value is already a number, as in exports.
+    """
+    return {
+        key: value for key, value in row.items()
+        if key not in COMPUTED_COLUMNS
+        or (key in LEGACY_FIELD_NAMES and LEGACY_FIELD_NAMES[key] not in row and not _is_number(value))
+    }
+
+
+def _csv_parser(column):
+    if isinstance(column.type, JSON):
+        return json.loads
+    if isinstance(column.type, Boolean):
+        return lambda value: value == 'True'
+    if isinstance(column.type, Integer):
+        return int
+    if isinstance(column.type, Float):
+        return float
+    if isinstance(column.type, DateTime):
+        return datetime.fromisoformat
+    return str
+
+
+# CSV fields arrive as strings; typed like the export's source so the content hash matches
+CSV_PARSERS = {column.name: _csv_parser(column) for column in Property.__table__.columns}
+
+# Session-scoped staging table with every listing column but the surrogate key
+staging = Table(
+    'properties_staging', MetaData(),
+    *(Column(column.name, column.type) for column in Property.__table__.columns if column.name != 'id'),
+    prefixes=['TEMPORARY'],
+)
+
+
+def read_rows(path, load_format):
+    """Yield property dicts from an NDJSON or CSV file (``-`` for stdin, ``.gz`` decompressed).
+
+    ``COMPUTED_COLUMNS`` are dropped (see ``_drop_computed``). Empty CSV fields are read as missing
+    values and the others are parsed by column type. Files written by
+    ``src.processor.export`` therefore hash like the stored rows, and
+    loading one back changes nothing (check with ``--dry-run``).
+    """
+    if path == '-':
+        stream = io.TextIOWrapper(sys.stdin.buffer, encoding='utf-8', newline='')
+    elif path.endswith('.gz'):
+        stream = gzip.open(path, 'rt', encoding='utf-8', newline='')
+    else:
+        stream = open(path, encoding='utf-8', newline='')
+    with stream:
+        if load_format == 'csv':
+            for row in csv.DictReader(stream):
+                row = _drop_computed({key: value for key, value in row.items() if value != ''})
+                # Legacy fields stay strings, as scraped
+                yield {
+                    key: value if key in LEGACY_FIELD_NAMES else CSV_PARSERS.get(key, str)(value)
+                    for key, value in row.items()
+                }
+        else:
+            for line in stream:
+                if line.strip():
+                    yield _drop_computed(json.loads(line))
+
+
+def chunked(rows, chunk_size=LOAD_CHUNK_SIZE):
+    rows = iter(rows)
+    while chunk := list(islice(rows, chunk_size)):
+        yield chunk
+
+
+def _copy_value(value):
+    if value is None:
+        return COPY_NULL
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False)
+    return value
+
+
+def prepare_chunk(rows):
+    """Clean raw property dicts and render them as ``COPY`` CSV.
+
+    Rows are cleaned, merged per ``property_id`` and grouped by column set
+    as in ``upsert_properties``. Returns ``[(columns, csv_text), ...]``.
+    Module-level and database-free so it can run in a worker process.
+    """
+    now = datetime.now()
+    latest = {}
+    for row in rows:
+        cleaned_data = clean_property_data(row)
+        property_id = cleaned_data.get('property_id')
+        if not property_id:
+            continue
+        if property_id in latest:
+            cleaned_data = {**latest[property_id], **cleaned_data}
+            cleaned_data['content_hash'] = compute_content_hash(cleaned_data)
+        latest[property_id] = cleaned_data
+
+    groups = defaultdict(list)
+    for row in latest.values():
+        row['last_checked'] = now
+        groups[tuple(sorted(row))].append(row)
+
+    prepared = []
+    for columns, group in groups.items():
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in group:
+            writer.writerow([_copy_value(row[column]) for column in columns])
+        prepared.append((columns, buffer.getvalue()))
+    return prepared
+
+
+def _record_price_history(connection, columns, now):
+    """Set-based ``record_price_changes``: a history row for every staged listing whose price is new or moved."""
+    table = Property.__table__
+    changed = and_(
+        staging.c.price_aed.isnot(None),
+        table.c.price_aed.is_distinct_from(staging.c.price_aed),
+        table.c.content_hash.is_distinct_from(staging.c.content_hash),
+    )
+    region = staging.c.region if 'region' in columns else table.c.region
+    # A listing's first price is dated like seed_price_history dates it
+    recorded_at = case(
+        (table.c.property_id.is_(None), func.coalesce(staging.c.updated_at, staging.c.created_at, literal(now))),
+        else_=literal(now),
+    )
+    source = select(
+        staging.c.property_id, region, staging.c.price_aed, table.c.price_aed, recorded_at
+    ).select_from(
+        staging.outerjoin(table, table.c.property_id == staging.c.property_id)
+    ).where(changed)
+    connection.execute(insert(PriceHistory).from_select(
+        ['property_id', 'region', 'price_aed', 'previous_price_aed', 'recorded_at'], source
+    ))
+
+
+def merge_chunk(connection, prepared):
+    """``COPY`` each prepared group into the staging table and merge it into ``properties``.
+
+    Like ``upsert_properties``, only the group's columns are overwritten and
+    only when the ``content_hash`` differs; unchanged listings just get
+    ``last_checked`` bumped. Price history is recorded in the same
+    transaction; the other rollups are rebuilt once the load finishes.
+    Returns ``(written, unchanged)``.
+    """
+    now = datetime.now()
+    table = Property.__table__
+    cursor = connection.connection.cursor()
+    written = unchanged = 0
+    for columns, data in prepared:
+        connection.execute(text(f'TRUNCATE {staging.name}'))
+        cursor.copy_expert(
+            f"COPY {staging.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv, NULL '{COPY_NULL}')",
+            io.StringIO(data),
+        )
+        if 'price_aed' in columns:
+            _record_price_history(connection, columns, now)
+
+        # Before the merge, which makes the written listings' hashes match too
+        result = connection.execute(
+            update(table)
+            .where(table.c.property_id == staging.c.property_id, table.c.content_hash == staging.c.content_hash)
+            .values(last_checked=staging.c.last_checked, updated_at=table.c.updated_at)
+        )
+        unchanged += result.rowcount
+
+        statement = insert(table).from_select(list(columns), select(*(staging.c[column] for column in columns)))
+        excluded = statement.excluded
+        update_columns = {column: excluded[column] for column in columns if column != 'property_id'}
+        update_columns['updated_at'] = now
+        if 'price' in columns:
+            update_columns['price_change_count'] = func.coalesce(table.c.price_change_count, 0) + case(
+                (and_(table.c.price.isnot(None), table.c.price.is_distinct_from(excluded.price)), 1),
+                else_=0,
+            )
+        result = connection.execute(statement.on_conflict_do_update(
+            index_elements=[table.c.property_id],
+            set_=update_columns,
+            where=table.c.content_hash.is_distinct_from(excluded.content_hash),
+        ))
+        written += result.rowcount
+    if written:
+        bump_data_version(connection)
+    return written, unchanged
+
+
+def load(engine, prepared_chunks, dry_run=False):
+    """Merge prepared chunks into ``properties``, one transaction per chunk; returns ``(written, unchanged)``.
+
+    The incremental rollups are not maintained; call :func:`refresh_rollups`
+    afterwards. With ``dry_run`` every chunk is rolled back, so only the
+    counts of what would change are reported.
+    """
+    written = unchanged = 0
+    started = time.perf_counter()
+    with engine.connect() as connection:
+        staging.create(connection)
+        connection.commit()
+        for prepared in prepared_chunks:
+            with connection.begin() as transaction:
+                chunk_written, chunk_unchanged = merge_chunk(connection, prepared)
+                if dry_run:
+                    transaction.rollback()
+            written += chunk_written
+            unchanged += chunk_unchanged
+            rate = (written + unchanged) / (time.perf_counter() - started)
+            logger.info(f"Loaded {written} listings, {unchanged} unchanged ({rate:.0f} rows/s)")
+        staging.drop(connection)
+        connection.commit()
+    return written, unchanged
+
+
+def refresh_rollups(engine):
+    """Rebuild ``region_stats``, the price sketches and the trend buckets after a bulk load."""
+    with engine.begin() as connection:
+        reconcile_region_stats(connection)
+    with engine.begin() as connection:
+        rebuild_price_sketches(connection)
+    with engine.begin() as connection:
+        rebuild_trend_buckets(connection)
+
+
+def prepare_chunks(chunks, workers=1):
+    """``prepare_chunk`` over ``chunks``, in order, spread over ``workers`` processes when more than one."""
+    if workers <= 1:
+        yield from map(prepare_chunk, chunks)
+        return
+    with multiprocessing.Pool(workers) as pool:
+        yield from pool.imap(prepare_chunk, chunks)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk-load NDJSON or CSV listing dumps into properties with COPY")
+    parser.add_argument('paths', nargs='+', help="Files to load (.gz is decompressed, - reads stdin)")
+    parser.add_argument('--format', choices=LOAD_FORMATS, help="Input format (default: from the file extension)")
+    parser.add_argument('--chunk-size', type=int, default=LOAD_CHUNK_SIZE, help="Rows per COPY and transaction")
+    parser.add_argument('--workers', type=int, default=1, help="Processes cleaning rows")
+    parser.add_argument('--skip-rollups', action='store_true',
+                        help="Do not rebuild region_stats, sketches and trend buckets afterwards")
+    parser.add_argument('--dry-run', action='store_true',
+                        help="Roll every chunk back and only report how many listings would change")
+    args = parser.parse_args()
+
+    def path_format(path):
+        if args.format:
+            return args.format
+        if path.removesuffix('.gz').endswith('.csv'):
+            return 'csv'
+        if path.removesuffix('.gz').endswith(('.ndjson', '.jsonl')):
+            return 'ndjson'
+        parser.error(f"Cannot tell the format of {path}; pass --format")
+
+    formats = [path_format(path) for path in args.paths]
+    engine = create_engine(settings.database_url)
+    try:
+        sync_schema(engine)
+        started = time.perf_counter()
+        rows = (row for path, load_format in zip(args.paths, formats) for row in read_rows(path, load_format))
+        written, unchanged = load(engine, prepare_chunks(chunked(rows, args.chunk_size), args.workers), args.dry_run)
+        logger.info(f"Loaded {written} listings, {unchanged} unchanged in {time.perf_counter() - started:.1f}s")
+        if args.dry_run:
+            logger.info("Dry run: nothing was written")
+        elif not args.skip_rollups:
+            refresh_rollups(engine)
+    finally:
+        engine.dispose()
@@ -0,0 +1,77 @@
+import re
+
+SQFT_PER_UNIT = {
+    'sqft': 1.0,
+    'sq. ft': 1.0,
+    'sq ft': 1.0,
+    'sqm': 10.7639,
+    'sq. m': 10.7639,
+    'm²': 10.7639,
+    'sqyd': 9.0,
+    'sq. yd': 9.0,
+}
+MULTIPLIERS = {'k': 1_000, 'm': 1_000_000, 'b': 1_000_000_000}
+
+_NUMBER = re.compile(r'(\d+(?:\.\d+)?)\s*([kmb])?\b', re.IGNORECASE)
+
+
+def _number(value):
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value), None
+    match = _NUMBER.search(str(value).replace(',', ''))
+    if not match:
+        return None
+    return float(match.group(1)), match.group(2)
+
+
+def parse_price(value):
+    """``"1,250,000"``, ``"AED 1.25M"`` -> ``1250000.0``."""
+    parsed = _number(value)
+    if parsed is None:
+        return None
+    number, suffix = parsed
+    return number * MULTIPLIERS.get((suffix or '').lower(), 1)
+
+
+def parse_area(value):
+    """``"1,200 sqft"`` -> ``1200.0``; square metres and yards are converted to square feet."""
+    parsed = _number(value)
+    if parsed is None:
+        return None
+    number, _ = parsed
+    text = str(value).lower()
+    for unit, factor in SQFT_PER_UNIT.items():
+        if unit in text:
+            return round(number * factor, 2)
+    return number
+
+
+def parse_rooms(value):
+    """``"Studio"`` -> ``0``, ``"7+"`` / ``"3 Beds"`` -> ``7`` / ``3``."""
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    if 'studio' in str(value).lower():
+        return 0
+    parsed = _number(value)
+    return int(parsed[0]) if parsed else None
+
+
+# typed column -> (source column, parser)
+TYPED_COLUMNS = {
+    'price_aed': ('price', parse_price),
+    'area_sqft': ('area', parse_area),
+    'beds_int': ('beds', parse_rooms),
+    'baths_int': ('baths', parse_rooms),
+}
+
+
+def normalize_property(cleaned_data):
+    """Add typed numeric columns for the source fields present in a cleaned record."""
+    for typed_column, (source_column, parser) in TYPED_COLUMNS.items():
+        if source_column in cleaned_data:
+            cleaned_data[typed_column] = parser(cleaned_data[source_column])
+    return cleaned_data
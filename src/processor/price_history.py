@@ -0,0 +1,170 @@
+from datetime import datetime, timedelta
+from sqlalchemy import and_, case, delete, exists, func, literal, not_, select, union_all
+from sqlalchemy import insert as sql_insert
+from sqlalchemy.dialects.postgresql import insert
+from src.models.history import PriceHistory, PriceTrendBucket
+from src.models.property import Property
+from src.processor.region_stats import UNKNOWN_REGION
+
+GRANULARITIES = ('day', 'week')
+
+
+def bucket_start(moment, granularity):
+    """First day of the bucket holding ``moment``; weeks start on Monday, as ``date_trunc('week')`` does."""
+    day = moment.date()
+    if granularity == 'week':
+        return day - timedelta(days=day.weekday())
+    return day
+
+
+def record_price_changes(connection, old, new, now=None):
+    """Append ``price_history`` rows for new and re-priced listings; returns the rows written.
+
+    ``old`` and ``new`` map property IDs to ``ListingState`` as in
+    ``upsert_properties``; listings whose price is unchanged write nothing.
+    The rows are folded into the trend buckets by ``update_trend_buckets``.
+    """
+    now = now or datetime.now()
+    history = []
+    for property_id, state in new.items():
+        if state.price_aed is None:
+            continue
+        previous = old.get(property_id)
+        previous_price = previous.price_aed if previous is not None else None
+        if previous_price == state.price_aed:
+            continue
+        history.append({
+            'property_id': property_id,
+            'region': state.region,
+            'price_aed': state.price_aed,
+            'previous_price_aed': previous_price,
+            'recorded_at': now,
+        })
+    if history:
+        connection.execute(insert(PriceHistory).values(history))
+    return history
+
+
+def update_trend_buckets(connection, history):
+    """Add ``price_history`` rows (as returned by ``record_price_changes``) to their trend buckets."""
+    if not history:
+        return
+
+    buckets = {}
+    for row in history:
+        for granularity in GRANULARITIES:
+            key = (granularity, bucket_start(row['recorded_at'], granularity), row['region'] or UNKNOWN_REGION)
+            bucket = buckets.setdefault(key, {
+                'granularity': key[0], 'bucket_start': key[1], 'region': key[2],
+                'observation_count': 0, 'price_sum': 0.0, 'min_price': None, 'max_price': None,
+                'change_count': 0, 'increase_count': 0, 'decrease_count': 0, 'change_pct_sum': 0.0,
+            })
+            price = row['price_aed']
+            bucket['observation_count'] += 1
+            bucket['price_sum'] += price
+            bucket['min_price'] = price if bucket['min_price'] is None else min(bucket['min_price'], price)
+            bucket['max_price'] = price if bucket['max_price'] is None else max(bucket['max_price'], price)
+            previous_price = row['previous_price_aed']
+            if previous_price:
+                bucket['change_count'] += 1
+                bucket['increase_count'] += price > previous_price
+                bucket['decrease_count'] += price < previous_price
+                bucket['change_pct_sum'] += (price - previous_price) / previous_price * 100
+
+    table = PriceTrendBucket.__table__
+    # Sorted so concurrent batches lock bucket rows in the same order
+    statement = insert(table).values([buckets[key] for key in sorted(buckets)])
+    excluded = statement.excluded
+    additive = ('observation_count', 'price_sum', 'change_count', 'increase_count', 'decrease_count', 'change_pct_sum')
+    connection.execute(statement.on_conflict_do_update(
+        index_elements=[table.c.granularity, table.c.bucket_start, table.c.region],
+        set_={
+            **{column: table.c[column] + excluded[column] for column in additive},
+            'min_price': func.least(table.c.min_price, excluded.min_price),
+            'max_price': func.greatest(table.c.max_price, excluded.max_price),
+        },
+    ))
+
+
+def seed_price_history(connection):
+    """Record the current price of listings that have no history yet; returns the rows added."""
+    has_history = exists().where(PriceHistory.property_id == Property.property_id)
+    source = select(
+        Property.property_id,
+        Property.region,
+        Property.price_aed,
+        func.coalesce(Property.updated_at, Property.created_at, func.now()),
+    ).where(Property.price_aed.isnot(None), not_(has_history))
+    result = connection.execute(
+        sql_insert(PriceHistory).from_select(
+            ['property_id', 'region', 'price_aed', 'recorded_at'], source
+        )
+    )
+    return result.rowcount
+
+
+def rebuild_trend_buckets(connection):
+    """Recompute every trend bucket from ``price_history`` with one ``GROUP BY`` per granularity."""
+    has_previous = PriceHistory.previous_price_aed > 0
+    selects = []
+    for granularity in GRANULARITIES:
+        start = func.date_trunc(granularity, PriceHistory.recorded_at).cast(PriceTrendBucket.bucket_start.type)
+        region = func.coalesce(PriceHistory.region, UNKNOWN_REGION)
+        selects.append(
+            select(
+                literal(granularity),
+                start,
+                region,
+                func.count(),
+                func.sum(PriceHistory.price_aed),
+                func.min(PriceHistory.price_aed),
+                func.max(PriceHistory.price_aed),
+                func.count().filter(has_previous),
+                func.count().filter(and_(has_previous, PriceHistory.price_aed > PriceHistory.previous_price_aed)),
+                func.count().filter(and_(has_previous, PriceHistory.price_aed < PriceHistory.previous_price_aed)),
+                func.coalesce(func.sum(case(
+                    (has_previous,
+                     (PriceHistory.price_aed - PriceHistory.previous_price_aed) / PriceHistory.previous_price_aed * 100),
+                )), 0),
+            ).group_by(start, region)
+        )
+    connection.execute(delete(PriceTrendBucket))
+    result = connection.execute(
+        sql_insert(PriceTrendBucket).from_select(
+            ['granularity', 'bucket_start', 'region', 'observation_count', 'price_sum', 'min_price', 'max_price',
+             'change_count', 'increase_count', 'decrease_count', 'change_pct_sum'],
+            union_all(*selects),
+        )
+    )
+    return result.rowcount
+
+
+def trends_query(granularity, region=None, since=None, until=None):
+    table = PriceTrendBucket.__table__
+    query = select(table).where(table.c.granularity == granularity)
+    if region is not None:
+        query = query.where(table.c.region == region)
+    if since is not None:
+        query = query.where(table.c.bucket_start >= bucket_start(since, granularity))
+    if until is not None:
+        query = query.where(table.c.bucket_start <= until.date())
+    return query.order_by(table.c.region, table.c.bucket_start)
+
+
+def summarize_trends(rows):
+    """``{region: [bucket, ...]}`` with averages, from ``price_trend_buckets`` rows."""
+    series = {}
+    for row in rows:
+        region = None if row.region == UNKNOWN_REGION else row.region
+        series.setdefault(region, []).append({
+            'bucket_start': row.bucket_start.isoformat(),
+            'observations': row.observation_count,
+            'avg_price': row.price_sum / row.observation_count if row.observation_count else None,
+            'min_price': row.min_price,
+            'max_price': row.max_price,
+            'price_changes': row.change_count,
+            'increases': row.increase_count,
+            'decreases': row.decrease_count,
+            'avg_change_pct': row.change_pct_sum / row.change_count if row.change_count else None,
+        })
+    return series
@@ -0,0 +1,240 @@
+from collections import defaultdict, namedtuple
+from datetime import datetime
+import hashlib
+from sqlalchemy import delete, func, or_, select, text, update
+from sqlalchemy.dialects.postgresql import insert
+from src.models.property import Property
+from src.models.stats import RegionStats
+from src.processor.data_version import bump_data_version
+
+# region_stats key for listings without a region
+UNKNOWN_REGION = ''
+
+# First key of the per-listing advisory locks taken at ingest
+LISTING_LOCK_NAMESPACE = 0x4b494c44
+
+# The columns of a listing that the rollups depend on
+ListingState = namedtuple('ListingState', ['region', 'truchecked', 'price_aed', 'area_sqft'])
+LISTING_STATE_COLUMNS = [Property.region, Property.trucheck_date, Property.price_aed, Property.area_sqft]
+
+
+def listing_state(region, trucheck_date, price_aed, area_sqft):
+    return ListingState(region, trucheck_date is not None, price_aed, area_sqft)
+
+
+def region_summary_query():
+    """Per-region and overall listing stats from a single scan of ``properties``.
+
+    ``GROUP BY ROLLUP(region)`` adds the grand-total row, told apart from a
+    NULL region by ``GROUPING(region)``; the TruCheck count is a ``FILTER``
+    aggregate over the same rows.
+    """
+    return select(
+        Property.region,
+        func.grouping(Property.region).label('is_total'),
+        func.count(Property.id).label('listing_count'),
+        func.count(Property.id).filter(Property.trucheck_date.isnot(None)).label('trucheck_count'),
+        func.count(Property.price_aed).label('price_count'),
+        func.coalesce(func.sum(Property.price_aed), 0).label('price_sum'),
+        func.min(Property.price_aed).label('min_price'),
+        func.max(Property.price_aed).label('max_price'),
+    ).group_by(func.rollup(Property.region))
+
+
+def _stats(listing_count, trucheck_count, price_count, price_sum, min_price, max_price):
+    return {
+        'count': listing_count,
+        'trucheck_count': trucheck_count,
+        'avg_price': price_sum / price_count if price_count else None,
+        'min_price': min_price,
+        'max_price': max_price,
+    }
+
+
+def region_stats_query():
+    """The populated ``region_stats`` rows, ordered by region."""
+    table = RegionStats.__table__
+    return select(table).where(table.c.listing_count > 0).order_by(table.c.region)
+
+
+def summarize_region_stats(rows):
+    """``(regions, total)`` stats from ``region_stats`` rows; the total is combined in Python."""
+    regions = {}
+    for row in rows:
+        region = None if row.region == UNKNOWN_REGION else row.region
+        regions[region] = _stats(
+            row.listing_count, row.trucheck_count, row.price_count, row.price_sum, row.min_price, row.max_price
+        )
+    min_prices = [row.min_price for row in rows if row.min_price is not None]
+    max_prices = [row.max_price for row in rows if row.max_price is not None]
+    total = _stats(
+        sum(row.listing_count for row in rows),
+        sum(row.trucheck_count for row in rows),
+        sum(row.price_count for row in rows),
+        sum(row.price_sum for row in rows),
+        min(min_prices, default=None),
+        max(max_prices, default=None),
+    )
+    return regions, total
+
+
+def region_summary(connection):
+    """``(regions, total)`` stats read from ``region_stats``, one row per region."""
+    return summarize_region_stats(connection.execute(region_stats_query()).all())
+
+
+def _listing_lock_key(property_id):
+    # Stable across processes, unlike hash(); fits the int4 key of pg_advisory_xact_lock(int4, int4)
+    return int.from_bytes(hashlib.blake2b(property_id.encode('utf-8'), digest_size=4).digest(), 'big', signed=True)
+
+
+def lock_listings(connection, property_ids):
+    """``{property_id: ListingState}`` for the stored listings among ``property_ids``.
+
+    A transaction-scoped advisory lock is taken per listing first, so two
+    batches carrying the same listing queue up even when it is not stored
+    yet; the second then reads what the first wrote. Locks are taken in
+    key order and the rows in ``property_id`` order, so overlapping batches
+    cannot deadlock. Everything stays locked until the transaction ends.
+    """
+    property_ids = sorted(set(property_ids))
+    keys = sorted({_listing_lock_key(property_id) for property_id in property_ids})
+    connection.execute(
+        text(
+            'SELECT pg_advisory_xact_lock(:namespace, key) '
+            'FROM unnest(CAST(:keys AS integer[])) WITH ORDINALITY AS locks(key, position) ORDER BY position'
+        ),
+        {'namespace': LISTING_LOCK_NAMESPACE, 'keys': keys},
+    )
+    result = connection.execute(
+        select(Property.property_id, *LISTING_STATE_COLUMNS)
+        .where(Property.property_id.in_(property_ids))
+        .order_by(Property.property_id)
+        .with_for_update()
+    )
+    return {property_id: listing_state(*state) for property_id, *state in result}
+
+
+def _region_filter(region):
+    if region == UNKNOWN_REGION:
+        return or_(Property.region.is_(None), Property.region == UNKNOWN_REGION)
+    return Property.region == region
+
+
+def apply_region_deltas(connection, old, new):
+    """Fold listing changes into ``region_stats``.
+
+    ``old`` and ``new`` map property IDs to ``ListingState``; a listing
+    missing from ``old`` is new. Counts and sums are adjusted by
+    delta. A removed price cannot shrink min/max incrementally, so regions
+    that lost a boundary price re-read it through the ``(region, price_aed)``
+    index. A region's counts may dip below zero while deltas arrive out of
+    order, so only regions that reach exactly zero listings are dropped.
+    """
+    deltas = {}
+    removed = defaultdict(list)
+
+    def fold(state, sign):
+        region, truchecked, price = state.region, state.truchecked, state.price_aed
+        key = region or UNKNOWN_REGION
+        delta = deltas.setdefault(key, {
+            'region': key, 'listing_count': 0, 'trucheck_count': 0, 'price_count': 0,
+            'price_sum': 0.0, 'min_price': None, 'max_price': None,
+        })
+        delta['listing_count'] += sign
+        delta['trucheck_count'] += sign * truchecked
+        if price is None:
+            return
+        delta['price_count'] += sign
+        delta['price_sum'] += sign * price
+        if sign > 0:
+            delta['min_price'] = price if delta['min_price'] is None else min(delta['min_price'], price)
+            delta['max_price'] = price if delta['max_price'] is None else max(delta['max_price'], price)
+        else:
+            removed[key].append(price)
+
+    for property_id, state in new.items():
+        previous = old.get(property_id)
+        if previous is not None and previous[:3] == state[:3]:
+            continue
+        if previous is not None:
+            fold(previous, -1)
+        fold(state, 1)
+
+    if not deltas:
+        return
+
+    now = datetime.now()
+    table = RegionStats.__table__
+    # Sorted so concurrent batches lock region rows in the same order
+    statement = insert(table).values([deltas[key] for key in sorted(deltas)])
+    excluded = statement.excluded
+    connection.execute(statement.on_conflict_do_update(
+        index_elements=[table.c.region],
+        set_={
+            'listing_count': table.c.listing_count + excluded.listing_count,
+            'trucheck_count': table.c.trucheck_count + excluded.trucheck_count,
+            'price_count': table.c.price_count + excluded.price_count,
+            'price_sum': table.c.price_sum + excluded.price_sum,
+            'min_price': func.least(table.c.min_price, excluded.min_price),
+            'max_price': func.greatest(table.c.max_price, excluded.max_price),
+            'updated_at': now,
+        },
+    ))
+
+    for key in sorted(removed):
+        prices = removed[key]
+        connection.execute(
+            update(table)
+            .where(table.c.region == key)
+            .where(or_(table.c.min_price >= min(prices), table.c.max_price <= max(prices)))
+            .values(
+                min_price=select(func.min(Property.price_aed)).where(_region_filter(key)).scalar_subquery(),
+                max_price=select(func.max(Property.price_aed)).where(_region_filter(key)).scalar_subquery(),
+            )
+        )
+    connection.execute(delete(table).where(table.c.listing_count == 0))
+
+
+def reconcile_region_stats(connection):
+    """Rebuild ``region_stats`` from ``properties`` with the summary query; returns the region count.
+
+    The table lock holds back ingest's deltas until the rebuild commits, so
+    none is lost; one whose listings committed before the rebuild read them
+    counts them twice, until the next reconcile. Readers are not blocked.
+    """
+    connection.execute(text('LOCK TABLE region_stats IN EXCLUSIVE MODE'))
+    rows = [
+        {
+            'region': row.region or UNKNOWN_REGION,
+            'listing_count': row.listing_count,
+            'trucheck_count': row.trucheck_count,
+            'price_count': row.price_count,
+            'price_sum': row.price_sum,
+            'min_price': row.min_price,
+            'max_price': row.max_price,
+            'updated_at': datetime.now(),
+        }
+        for row in connection.execute(region_summary_query())
+        if not row.is_total and row.listing_count
+    ]
+    connection.execute(delete(RegionStats))
+    # NULL and '' regions both land on the UNKNOWN_REGION key
+    merged = {}
+    for row in rows:
+        if row['region'] in merged:
+            current = merged[row['region']]
+            for column in ('listing_count', 'trucheck_count', 'price_count', 'price_sum'):
+                current[column] += row[column]
+            current['min_price'] = min(
+                (price for price in (current['min_price'], row['min_price']) if price is not None), default=None
+            )
+            current['max_price'] = max(
+                (price for price in (current['max_price'], row['max_price']) if price is not None), default=None
+            )
+        else:
+            merged[row['region']] = row
+    if merged:
+        connection.execute(insert(RegionStats).values(list(merged.values())))
+    bump_data_version(connection)
+    return len(merged)
@@ -0,0 +1,184 @@
+from collections import defaultdict
+from datetime import datetime
+from sqlalchemy import ARRAY, Float, and_, delete, func, literal, or_, select, text, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from src.models.property import Property
+from src.models.stats import PriceSketch
+from src.processor.data_version import bump_data_version
+from src.processor.region_stats import UNKNOWN_REGION, ListingState
+from src.processor.tdigest import TDigest
+
+SKETCH_COMPRESSION = 200
+
+
+def _price(state):
+    return state.price_aed
+
+
+def _price_per_sqft(state):
+    if state.price_aed is None or not state.area_sqft:
+        return None
+    return state.price_aed / state.area_sqft
+
+
+# metric -> value of a ListingState
+SKETCH_METRICS = {
+    'price': _price,
+    'price_per_sqft': _price_per_sqft,
+}
+
+# metric -> SQL expression, for the exact mode
+METRIC_COLUMNS = {
+    'price': Property.price_aed,
+    'price_per_sqft': Property.price_aed / func.nullif(Property.area_sqft, 0),
+}
+
+
+def update_price_sketches(connection, old, new):
+    """Add changed listing values to the per-region digests.
+
+    Run after the listings commit (``ingest_properties``), in a transaction of
+    its own, since the digest rows stay locked until it ends.
+
+    Digests cannot forget values either, so a replaced price stays counted
+    until ``rebuild_price_sketches`` runs; the periodic rebuild bounds that drift.
+    """
+    additions = defaultdict(list)
+    for property_id, state in new.items():
+        previous = old.get(property_id)
+        region = state.region or UNKNOWN_REGION
+        for metric, value_of in SKETCH_METRICS.items():
+            value = value_of(state)
+            if value is None:
+                continue
+            if previous is not None and previous.region == state.region and value_of(previous) == value:
+                continue
+            additions[(region, metric)].append(value)
+    if not additions:
+        return
+
+    keys = sorted(additions)
+    stored = connection.execute(
+        select(PriceSketch.region, PriceSketch.metric, PriceSketch.digest)
+        .where(tuple_(PriceSketch.region, PriceSketch.metric).in_(keys))
+        .order_by(PriceSketch.region, PriceSketch.metric)
+        .with_for_update()
+    )
+    digests = {(region, metric): TDigest.from_bytes(digest) for region, metric, digest in stored}
+
+    now = datetime.now()
+    rows = []
+    for key in keys:
+        digest = digests.get(key) or TDigest(SKETCH_COMPRESSION)
+        digest.update(additions[key])
+        rows.append({'region': key[0], 'metric': key[1], 'digest': digest.to_bytes(), 'updated_at': now})
+    statement = insert(PriceSketch).values(rows)
+    connection.execute(statement.on_conflict_do_update(
+        index_elements=[PriceSketch.region, PriceSketch.metric],
+        set_={'digest': statement.excluded.digest, 'updated_at': now},
+    ))
+
+
+def rebuild_price_sketches(connection):
+    """Rebuild every digest from ``properties`` in one streaming pass; returns the number written.
+
+    The table lock holds back ingest's sketch updates until the rebuild
+    commits, so none of them is lost; one whose listings committed before the
+    rebuild read them counts them twice, until the next rebuild.
+    """
+    connection.execute(text('LOCK TABLE price_sketches IN EXCLUSIVE MODE'))
+    query = (
+        select(Property.region, Property.price_aed, Property.area_sqft)
+        .where(Property.price_aed.isnot(None))
+        .execution_options(stream_results=True, yield_per=10000)
+    )
+    result = connection.execute(query)
+    digests = {}
+    for region, price_aed, area_sqft in result:
+        state = ListingState(region, None, price_aed, area_sqft)
+        for metric, value_of in SKETCH_METRICS.items():
+            value = value_of(state)
+            if value is None:
+                continue
+            key = (state.region or UNKNOWN_REGION, metric)
+            if key not in digests:
+                digests[key] = TDigest(SKETCH_COMPRESSION)
+            digests[key].add(value)
+
+    connection.execute(delete(PriceSketch))
+    now = datetime.now()
+    if digests:
+        connection.execute(insert(PriceSketch).values([
+            {'region': region, 'metric': metric, 'digest': digest.to_bytes(), 'updated_at': now}
+            for (region, metric), digest in sorted(digests.items())
+        ]))
+    bump_data_version(connection)
+    return len(digests)
+
+
+def sketch_query(metric, region=None):
+    query = select(PriceSketch.region, PriceSketch.digest).where(PriceSketch.metric == metric)
+    if region is not None:
+        query = query.where(PriceSketch.region == region)
+    return query.order_by(PriceSketch.region)
+
+
+def merge_sketches(rows):
+    """``({region: digest}, merged digest)`` from ``(region, serialized digest)`` rows."""
+    regions = {}
+    total = TDigest(SKETCH_COMPRESSION)
+    for region, data in rows:
+        digest = TDigest.from_bytes(data)
+        regions[None if region == UNKNOWN_REGION else region] = digest
+        total.merge(digest)
+    return regions, total
+
+
+def _region_filter(query, region):
+    if region == UNKNOWN_REGION:
+        return query.where(or_(Property.region.is_(None), Property.region == UNKNOWN_REGION))
+    if region is not None:
+        return query.where(Property.region == region)
+    return query
+
+
+def exact_percentiles_query(metric, quantiles, region=None):
+    """Exact ``percentile_cont`` per region plus the total (``GROUP BY ROLLUP``) over ``properties``."""
+    value = METRIC_COLUMNS[metric]
+    query = select(
+        Property.region,
+        func.grouping(Property.region).label('is_total'),
+        func.count(value).label('count'),
+        func.percentile_cont(literal(list(quantiles), ARRAY(Float)))
+        .within_group(value)
+        .label('values'),
+    ).where(value.isnot(None)).group_by(func.rollup(Property.region))
+    return _region_filter(query, region)
+
+
+def exact_range_query(metric, region=None):
+    value = METRIC_COLUMNS[metric]
+    return _region_filter(select(func.min(value), func.max(value)).where(value.isnot(None)), region)
+
+
+def exact_histogram_query(metric, low, high, bins, region=None):
+    """Listing counts per equal-width bucket ``1..bins`` between ``low`` and ``high``."""
+    value = METRIC_COLUMNS[metric]
+    # width_bucket puts value == high into bins + 1; fold it into the last bucket
+    bucket = func.least(func.width_bucket(value, low, high, bins), bins).label('bucket')
+    query = (
+        select(bucket, func.count().label('count'))
+        .where(and_(value >= low, value <= high))
+        .group_by(bucket)
+    )
+    return _region_filter(query, region)
+
+
+def sketch_histogram(digest, low, high, bins):
+    """Approximate counts per equal-width bucket from a digest's CDF."""
+    edges = [low + (high - low) * i / bins for i in range(bins + 1)]
+    if digest.count == 0:
+        return edges, [0] * bins
+    cumulative = [digest.cdf(edge) for edge in edges]
+    counts = [round((cumulative[i + 1] - cumulative[i]) * digest.count) for i in range(bins)]
+    return edges, counts
@@ -0,0 +1,138 @@
+from array import array
+import math
+import struct
+
+# compression, count, min, max, centroid count
+_HEADER = struct.Struct('<ddddI')
+
+
+class TDigest:
+    """Merging t-digest (Dunning & Ertl) for approximate quantiles of a stream.
+
+    Centroids near the tails stay small, so p1/p99 remain accurate while the
+    whole digest is a few hundred centroids regardless of how many values were
+    added. Digests merge, so per-region digests combine into any grouping.
+    """
+
+    def __init__(self, compression=100):
+        self.compression = compression
+        self.means = []
+        self.weights = []
+        self.count = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self._buffer = []
+
+    def add(self, value, weight=1.0):
+        self._buffer.append((value, weight))
+        self.count += weight
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        if len(self._buffer) >= 5 * self.compression:
+            self._compress()
+
+    def update(self, values):
+        for value in values:
+            self.add(value)
+        return self
+
+    def merge(self, other):
+        other._compress()
+        self._buffer.extend(zip(other.means, other.weights))
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress()
+        return self
+
+    def _scale(self, q):
+        return self.compression / (2 * math.pi) * math.asin(2 * min(max(q, 0.0), 1.0) - 1)
+
+    def _compress(self):
+        if not self._buffer:
+            return
+        centroids = sorted(list(zip(self.means, self.weights)) + self._buffer)
+        self._buffer = []
+        total = sum(weight for _, weight in centroids)
+        means = []
+        weights = []
+        mean, weight = centroids[0]
+        weight_before = 0.0
+        k_lower = self._scale(0.0)
+        for next_mean, next_weight in centroids[1:]:
+            if self._scale((weight_before + weight + next_weight) / total) - k_lower <= 1:
+                weight += next_weight
+                mean += (next_mean - mean) * next_weight / weight
+            else:
+                means.append(mean)
+                weights.append(weight)
+                weight_before += weight
+                k_lower = self._scale(weight_before / total)
+                mean, weight = next_mean, next_weight
+        means.append(mean)
+        weights.append(weight)
+        self.means = means
+        self.weights = weights
+
+    def quantile(self, q):
+        """Approximate value at quantile ``q`` in [0, 1]; ``None`` for an empty digest."""
+        self._compress()
+        if not self.means:
+            return None
+        if len(self.means) == 1:
+            return self.means[0]
+        target = q * self.count
+        # Each centroid's mass is centred on its mean; interpolate between neighbouring centres
+        cumulative = 0.0
+        previous_center, previous_mean = 0.0, self.min
+        for mean, weight in zip(self.means, self.weights):
+            center = cumulative + weight / 2
+            if target <= center:
+                return _interpolate(target, previous_center, center, previous_mean, mean)
+            cumulative += weight
+            previous_center, previous_mean = center, mean
+        return _interpolate(target, previous_center, self.count, previous_mean, self.max)
+
+    def cdf(self, value):
+        """Approximate fraction of values <= ``value``."""
+        self._compress()
+        if not self.means:
+            return None
+        if value < self.min:
+            return 0.0
+        if value >= self.max:
+            return 1.0
+        cumulative = 0.0
+        previous_center, previous_mean = 0.0, self.min
+        for mean, weight in zip(self.means, self.weights):
+            center = cumulative + weight / 2
+            if value <= mean:
+                return _interpolate(value, previous_mean, mean, previous_center, center) / self.count
+            cumulative += weight
+            previous_center, previous_mean = center, mean
+        return _interpolate(value, previous_mean, self.max, previous_center, self.count) / self.count
+
+    def to_bytes(self):
+        self._compress()
+        return (
+            _HEADER.pack(self.compression, self.count, self.min, self.max, len(self.means))
+            + array('d', self.means).tobytes()
+            + array('d', self.weights).tobytes()
+        )
+
+    @classmethod
+    def from_bytes(cls, data):
+        compression, count, minimum, maximum, size = _HEADER.unpack_from(data)
+        values = array('d')
+        values.frombytes(data[_HEADER.size:_HEADER.size + 16 * size])
+        digest = cls(compression)
+        digest.count, digest.min, digest.max = count, minimum, maximum
+        digest.means = values[:size].tolist()
+        digest.weights = values[size:].tolist()
+        return digest
+
+
+def _interpolate(x, x0, x1, y0, y1):
+    if x1 <= x0:
+        return y1
+    return y0 + (y1 - y0) * (x - x0) / (x1 - x0)